@@ -26,6 +26,9 @@ contract BetMe {
 	bool public IsArbiterTransferMade;
 	bool public IsOpponentTransferMade;
 
+	mapping(address => uint256) public Credits;
+	uint256 private totalCredits;
+
 	constructor(
 		string  _assertion,
 		uint256 _deadline,
@@ -231,7 +234,9 @@ contract BetMe {
 
 	function withdraw() public {
 		require(ArbiterHasVoted || getTime() > Deadline);
-		if (msg.sender == ArbiterAddress) {
+		if (Credits[msg.sender] > 0) {
+			withdrawCredit();
+		} else if (msg.sender == ArbiterAddress) {
 			withdrawArbiter();
 		} else if (msg.sender == OwnerAddress) {
 			withdrawOwner();
@@ -245,17 +250,12 @@ contract BetMe {
 	function withdrawArbiter() internal {
 		require(!IsArbiterTransferMade);
 		IsArbiterTransferMade = true;
-		if (IsArbiterLazy()) return;
-		uint256 amount = IsArbiterAddressConfirmed ? ArbiterPenaltyAmount : 0;
-		if (ArbiterHasVoted && IsDecisionMade) {
-			amount = amount.add(ArbiterFeeAmountInEther());
-		}
+		uint256 amount = arbiterWithdrawalAmount();
 		if (amount > 0) ArbiterAddress.transfer(amount);
 	}
 
 	function withdrawOwner() internal {
-		require(!IsDecisionMade || IsAssertionTrue);
-		require(!IsOwnerTransferMade);
+		require(IsOwnerTransferPending());
 		IsOwnerTransferMade = true;
 		OwnerAddress.transfer(ownerPayout());
 	}
@@ -266,6 +266,49 @@ contract BetMe {
 		OpponentAddress.transfer(opponentPayout());
 	}
 
+	// Credits exist because the stipend was not enough for the recipient,
+	// so they are paid with all remaining gas. State is settled beforehand.
+	function withdrawCredit() internal {
+		uint256 amount = Credits[msg.sender];
+		Credits[msg.sender] = 0;
+		totalCredits = totalCredits.sub(amount);
+		require(msg.sender.call.value(amount)());
+	}
+
+	// Pays every party in one transaction. Payments are sent with the 2300 gas
+	// stipend; one that fails is credited to be taken later with withdraw().
+	function settle() public {
+		require(ArbiterHasVoted || getTime() > Deadline);
+		if (!IsArbiterTransferMade) {
+			IsArbiterTransferMade = true;
+			payOrCredit(ArbiterAddress, arbiterWithdrawalAmount());
+		}
+		if (IsOwnerTransferPending()) {
+			IsOwnerTransferMade = true;
+			payOrCredit(OwnerAddress, ownerPayout());
+		}
+		if (IsOpponentTransferPending()) {
+			IsOpponentTransferMade = true;
+			payOrCredit(OpponentAddress, opponentPayout());
+		}
+	}
+
+	function payOrCredit(address _to, uint256 _amount) internal {
+		if (_amount == 0) return;
+		if (!_to.send(_amount)) {
+			Credits[_to] = Credits[_to].add(_amount);
+			totalCredits = totalCredits.add(_amount);
+		}
+	}
+
+	function arbiterWithdrawalAmount() internal view returns (uint256 amount) {
+		if (IsArbiterLazy()) return 0;
+		amount = IsArbiterAddressConfirmed ? ArbiterPenaltyAmount : 0;
+		if (ArbiterHasVoted && IsDecisionMade) {
+			amount = amount.add(ArbiterFeeAmountInEther());
+		}
+	}
+
 	function ArbiterFeeAmountInEther() public view returns (uint256){
 		return betAmount.mul(ArbiterFee).div(1e20);
 	}
@@ -305,6 +348,10 @@ contract BetMe {
 		}
 	}
 
+	function IsOwnerTransferPending() internal view returns (bool) {
+		return !IsOwnerTransferMade && (!IsDecisionMade || IsAssertionTrue);
+	}
+
 	function IsOpponentTransferPending() internal view returns (bool) {
 		if (IsOpponentTransferMade) return false;
 		if (IsArbiterLazy()) return true;
@@ -315,6 +362,7 @@ contract BetMe {
 	function deleteContract() public onlyOwner {
 		require(!IsVotingInProgress());
 		require(!IsOpponentTransferPending());
+		require(totalCredits == 0);
 		if (IsArbiterAddressConfirmed && !IsArbiterTransferMade) {
 			withdrawArbiter();
 		}
@@ -0,0 +1,314 @@
+pragma solidity ^0.4.24;
+
+import "../node_modules/openzeppelin-solidity/contracts/math/SafeMath.sol";
+
+contract BetMePool {
+	using SafeMath for uint256;
+
+	string public Assertion;
+	uint256 public Deadline;
+	uint256 public BettingDeadline;
+	uint256 public ArbiterFee;
+	uint256 public ArbiterPenaltyAmount;
+
+	uint256 public StateVersion;
+
+	address public OwnerAddress;
+	address public ArbiterAddress;
+
+	mapping(address => uint256) public TrueBets;
+	mapping(address => uint256) public FalseBets;
+	mapping(address => bool) public IsPayoutMade;
+	uint256 public TotalTrue;
+	uint256 public TotalFalse;
+	uint256 private unclaimedTrue;
+	uint256 private unclaimedFalse;
+
+	bool public IsArbiterAddressConfirmed;
+	bool public ArbiterHasVoted;
+	bool public IsDecisionMade;
+	bool public IsAssertionTrue;
+	bool public IsArbiterTransferMade;
+
+	constructor(
+		string  _assertion,
+		uint256 _deadline,
+		uint256 _bettingDeadline,
+		uint256 _fee,
+		address _arbiterAddr,
+		uint256 _arbiterPenaltyAmount
+	) public {
+		OwnerAddress = msg.sender;
+		_setAssertionText(_assertion);
+		_setDeadline(_deadline);
+		_setBettingDeadline(_bettingDeadline);
+		_setArbiterFee(_fee);
+		ArbiterAddress = _arbiterAddr;
+		ArbiterPenaltyAmount = _arbiterPenaltyAmount;
+	}
+
+	modifier onlyOwner() {
+		require(msg.sender == OwnerAddress);
+		_;
+	}
+
+	modifier onlyArbiter() {
+		require(msg.sender == ArbiterAddress);
+		_;
+	}
+
+	modifier forbidArbiter() {
+		require(msg.sender != ArbiterAddress);
+		_;
+	}
+
+	modifier ensureTimeToVote() {
+		require(IsVotingInProgress());
+		_;
+	}
+
+	modifier ensureBettingOpen() {
+		require(IsBettingOpen());
+		_;
+	}
+
+	modifier onlyArbiterCandidate() {
+		require(!IsArbiterAddressConfirmed);
+		require(msg.sender == ArbiterAddress);
+		_;
+	}
+
+	modifier increaseState() {
+		StateVersion = StateVersion.add(1);
+		_;
+	}
+
+	modifier requireArbiterNotConfirmed() {
+		require(!IsArbiterAddressConfirmed);
+		_;
+	}
+
+	modifier stateNumberMatches(uint256 _agreedState) {
+		require(StateVersion == _agreedState);
+		_;
+	}
+
+	modifier requireArbiterConfirmed() {
+		require(IsArbiterAddressConfirmed);
+		_;
+	}
+
+	modifier requireNoBetsMade() {
+		require(TotalTrue == 0 && TotalFalse == 0);
+		_;
+	}
+
+	function IsPoolMatched() internal view returns (bool) {
+		return TotalTrue > 0 && TotalFalse > 0;
+	}
+
+	// Betting closes before voting opens, so nobody can bet on an outcome
+	// which is already known or front-run the arbiter's decision
+	function IsBettingOpen() internal view returns (bool) {
+		return IsArbiterAddressConfirmed && getTime() < BettingDeadline;
+	}
+
+	function IsVotingInProgress() internal view returns (bool) {
+		return IsArbiterAddressConfirmed && !ArbiterHasVoted && IsPoolMatched() &&
+			getTime() >= BettingDeadline && getTime() < Deadline;
+	}
+
+	function IsArbiterLazy() internal view returns (bool) {
+		return (IsPoolMatched() && getTime() > Deadline && !ArbiterHasVoted);
+	}
+
+	function getTime() public view returns (uint256) {
+		return now;
+	}
+
+	function setAssertionText(string _text) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setAssertionText(_text);
+	}
+
+	function _setAssertionText(string _text) internal {
+		require(bytes(_text).length > 0);
+		Assertion = _text;
+	}
+
+	function setDeadline(uint256 _timestamp) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setDeadline(_timestamp);
+	}
+
+	function _setDeadline(uint256 _timestamp) internal {
+		require(_timestamp > getTime());
+		require(_timestamp > BettingDeadline);
+		Deadline = _timestamp;
+	}
+
+	function setBettingDeadline(uint256 _timestamp) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setBettingDeadline(_timestamp);
+	}
+
+	function _setBettingDeadline(uint256 _timestamp) internal {
+		require(_timestamp > getTime());
+		require(_timestamp < Deadline);
+		BettingDeadline = _timestamp;
+	}
+
+	function setArbiterFee(uint256 _percent) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setArbiterFee(_percent);
+	}
+
+	function _setArbiterFee(uint256 _percent) internal {
+		require(_percent < 100e18); // 100.0% float as integer with decimal=18
+		ArbiterFee = _percent;
+	}
+
+	function setArbiterAddress(address _addr) public onlyOwner requireArbiterNotConfirmed increaseState {
+		require(_addr != address(ArbiterAddress));
+		require(_addr != address(OwnerAddress));
+		ArbiterAddress = _addr;
+	}
+
+	function setArbiterPenaltyAmount(uint256 _amount) public onlyOwner requireArbiterNotConfirmed increaseState {
+		require(_amount != ArbiterPenaltyAmount);
+		ArbiterPenaltyAmount = _amount;
+	}
+
+	function agreeToBecameArbiter(uint256 _agreedState) public payable
+		onlyArbiterCandidate
+		stateNumberMatches(_agreedState)
+	{
+		require(ArbiterAddress != address(0));
+		require(msg.value == ArbiterPenaltyAmount);
+		IsArbiterAddressConfirmed = true;
+	}
+
+	function arbiterSelfRetreat() public onlyArbiter requireArbiterConfirmed requireNoBetsMade {
+		IsArbiterAddressConfirmed = false;
+		if (ArbiterPenaltyAmount > 0 ) {
+			ArbiterAddress.transfer(ArbiterPenaltyAmount);
+		}
+	}
+
+	function betAssertIsTrue(uint256 _agreedState) public payable
+		ensureBettingOpen
+		forbidArbiter
+		stateNumberMatches(_agreedState)
+	{
+		require(msg.value > 0);
+		require(FalseBets[msg.sender] == 0);
+		TrueBets[msg.sender] = TrueBets[msg.sender].add(msg.value);
+		TotalTrue = TotalTrue.add(msg.value);
+		unclaimedTrue = unclaimedTrue.add(msg.value);
+	}
+
+	function betAssertIsFalse(uint256 _agreedState) public payable
+		ensureBettingOpen
+		forbidArbiter
+		stateNumberMatches(_agreedState)
+	{
+		require(msg.value > 0);
+		require(TrueBets[msg.sender] == 0);
+		FalseBets[msg.sender] = FalseBets[msg.sender].add(msg.value);
+		TotalFalse = TotalFalse.add(msg.value);
+		unclaimedFalse = unclaimedFalse.add(msg.value);
+	}
+
+	function agreeAssertionTrue() public onlyArbiter ensureTimeToVote {
+		ArbiterHasVoted = true;
+		IsDecisionMade = true;
+		IsAssertionTrue = true;
+	}
+
+	function agreeAssertionFalse() public onlyArbiter ensureTimeToVote {
+		ArbiterHasVoted = true;
+		IsDecisionMade = true;
+	}
+
+	function agreeAssertionUnresolvable() public onlyArbiter ensureTimeToVote {
+		ArbiterHasVoted = true;
+	}
+
+	function withdraw() public {
+		require(ArbiterHasVoted || getTime() > Deadline);
+		if (msg.sender == ArbiterAddress) {
+			withdrawArbiter();
+		} else {
+			withdrawBettor();
+		}
+	}
+
+	function withdrawArbiter() internal {
+		require(!IsArbiterTransferMade);
+		IsArbiterTransferMade = true;
+		if (IsArbiterLazy()) return;
+		uint256 amount = IsArbiterAddressConfirmed ? ArbiterPenaltyAmount : 0;
+		if (ArbiterHasVoted && IsDecisionMade) {
+			amount = amount.add(ArbiterFeeAmountInEther());
+		}
+		if (amount > 0) ArbiterAddress.transfer(amount);
+	}
+
+	function withdrawBettor() internal {
+		require(!IsPayoutMade[msg.sender]);
+		uint256 amount = payoutOf(msg.sender);
+		require(amount > 0);
+		IsPayoutMade[msg.sender] = true;
+		unclaimedTrue = unclaimedTrue.sub(TrueBets[msg.sender]);
+		unclaimedFalse = unclaimedFalse.sub(FalseBets[msg.sender]);
+		msg.sender.transfer(amount);
+	}
+
+	function WinningTotal() internal view returns (uint256) {
+		return IsAssertionTrue ? TotalTrue : TotalFalse;
+	}
+
+	function LosingTotal() internal view returns (uint256) {
+		return IsAssertionTrue ? TotalFalse : TotalTrue;
+	}
+
+	// Fee is charged on the losing pool, so it is known only after decision
+	function ArbiterFeeAmountInEther() public view returns (uint256) {
+		if (!IsDecisionMade) return 0;
+		return LosingTotal().mul(ArbiterFee).div(1e20);
+	}
+
+	function payoutOf(address _addr) public view returns (uint256) {
+		uint256 stake = TrueBets[_addr].add(FalseBets[_addr]);
+		if (IsArbiterLazy()) {
+			return stake.add(ArbiterPenaltyAmount.mul(stake).div(TotalTrue.add(TotalFalse)));
+		}
+		if (ArbiterHasVoted && IsDecisionMade) {
+			uint256 winningStake = IsAssertionTrue ? TrueBets[_addr] : FalseBets[_addr];
+			uint256 prize = LosingTotal().sub(ArbiterFeeAmountInEther());
+			return winningStake.add(prize.mul(winningStake).div(WinningTotal()));
+		}
+		return stake;
+	}
+
+	function arbiterPayout() public view returns (uint256 amount) {
+		if (IsArbiterLazy()) return 0;
+		if (ArbiterHasVoted && IsDecisionMade) {
+			amount = ArbiterFeeAmountInEther();
+		}
+		if (IsArbiterAddressConfirmed) {
+			amount = amount.add(ArbiterPenaltyAmount);
+		}
+	}
+
+	function IsPayoutPending() internal view returns (bool) {
+		if (IsDecisionMade) {
+			return (IsAssertionTrue ? unclaimedTrue : unclaimedFalse) > 0;
+		}
+		return unclaimedTrue.add(unclaimedFalse) > 0;
+	}
+
+	function deleteContract() public onlyOwner {
+		require(!IsPayoutPending());
+		if (IsArbiterAddressConfirmed && !IsArbiterTransferMade) {
+			withdrawArbiter();
+		}
+		selfdestruct(OwnerAddress);
+	}
+}
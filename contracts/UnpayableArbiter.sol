@@ -4,6 +4,7 @@ import "./BetMe.sol";
 
 contract UnpayableArbiter {
 	BetMe _betContract;
+	bool _acceptPayments;
 
 	constructor(BetMe _addr) public {
 		setBetContract(_addr);
@@ -13,6 +14,10 @@ contract UnpayableArbiter {
 		_betContract = _addr;
 	}
 
+	function setAcceptPayments(bool _val) public {
+		_acceptPayments = _val;
+	}
+
 	function agreeToBecameArbiter() public payable {
 		uint256 _stateNumber = _betContract.StateVersion();
 		_betContract.agreeToBecameArbiter.value(msg.value)(_stateNumber);
@@ -22,7 +27,11 @@ contract UnpayableArbiter {
 		_betContract.arbiterSelfRetreat();
 	}
 
-	function () public {
-		revert();
+	function withdraw() public {
+		_betContract.withdraw();
+	}
+
+	function () public payable {
+		require(_acceptPayments);
 	}
 }
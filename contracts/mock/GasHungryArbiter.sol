@@ -0,0 +1,27 @@
+pragma solidity ^0.4.24;
+
+import '../BetMe.sol';
+
+// Arbiter wallet which needs more than the 2300 gas stipend to receive
+// ether, like a multisig or a proxy wallet recording every payment.
+contract GasHungryArbiter {
+	BetMe _betContract;
+	uint256 public PaymentsReceived;
+
+	constructor(BetMe _addr) public {
+		_betContract = _addr;
+	}
+
+	function agreeToBecameArbiter() public payable {
+		uint256 _stateNumber = _betContract.StateVersion();
+		_betContract.agreeToBecameArbiter.value(msg.value)(_stateNumber);
+	}
+
+	function withdraw() public {
+		_betContract.withdraw();
+	}
+
+	function () public payable {
+		PaymentsReceived = PaymentsReceived + 1;
+	}
+}
@@ -0,0 +1,37 @@
+pragma solidity ^0.4.24;
+
+import '../BetMePool.sol';
+
+contract MockBetMePool is BetMePool {
+	uint256 public _time;
+	function getTime() public view returns (uint256) {
+		if (_time > 0) {
+			return _time;
+		}
+		return now;
+	}
+	function setTime(uint256 _val) public {
+		 _time = _val;
+	}
+
+	function () public payable {}
+
+	constructor(
+		string  _assertion,
+		uint256 _deadline,
+		uint256 _bettingDeadline,
+		uint256 _fee,
+		address _arbiterAddr,
+		uint256 _arbiterPenaltyAmount
+	) public 
+		BetMePool(
+		_assertion,
+		_deadline,
+		_bettingDeadline,
+		_fee,
+		_arbiterAddr,
+		_arbiterPenaltyAmount
+		)
+	{
+	}
+}
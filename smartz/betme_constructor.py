@@ -1,8 +1,18 @@
+import hashlib
+import json
+import os
+
 from smartz.api.constructor_engine import ConstructorInstance
 
 
 class Constructor(ConstructorInstance):
 
+    # gas models per template sha256 next to this file, written by `python -m tools.calibrate`
+    _GAS_TABLE = 'betme_gas.json'
+
+    _gas_table = None
+    _template_hashes = {}
+
     def get_version(self):
         return {
             "result": "success",
@@ -31,6 +41,11 @@ class Constructor(ConstructorInstance):
                     "description": "Dispute should be resolved before this point in time, otherwise no one considered a winner. Choose a date and time in the future, otherwise deploy will fail.",
                     "$ref": "#/definitions/unixTime",
                 },
+                "bettingDeadline": {
+                    "title": "Betting deadline",
+                    "description": "Pooled bet only. Bets are accepted before this point in time and arbiter decides after it, so nobody can bet on a known outcome. Should be before the deadline. Leave blank to close betting halfway to the deadline.",
+                    "$ref": "#/definitions/unixTime",
+                },
                 "arbiterAddr": {
                     "title": "Arbiter address",
                     "description": "Arbiter decides is the assertion true, false or can not be checked. She gets the fee for judging and stakes deposit as a guarantee of motivation to get job done. When arbiter agrees to judge, contract's terms become inviolable.",
@@ -53,6 +68,12 @@ class Constructor(ConstructorInstance):
                     "description": "Ether value to be sent by arbiter as a guarantee of his motivation and returned to him after he made decision.",
                     "type": "number",
                 },
+                "pooled": {
+                    "title": "Pooled bet",
+                    "description": "Let anyone bet any amount for or against the assertion instead of a single opponent. Winners share the losing side pro rata to their bets, arbiter fee is taken from the losing side. Opponent address is ignored in this mode.",
+                    "type": "boolean",
+                    "default": False,
+                },
             }
         }
 
@@ -60,6 +81,9 @@ class Constructor(ConstructorInstance):
             "deadline": {
                 "ui:widget": "unixTime",
             },
+            "bettingDeadline": {
+                "ui:widget": "unixTime",
+            },
             "feePercent": {
                 "ui:widget": "ethCount",
             },
@@ -83,9 +107,14 @@ class Constructor(ConstructorInstance):
         feePercent = fields.get('feePercent', 0) or 0;
         arbiterPenaltyAmount = fields.get('arbiterPenaltyAmount', 0) or 0;
 
-        source = self.__class__._TEMPLATE \
+        # betting closes halfway to the deadline unless set explicitly
+        bettingDeadline = fields.get('bettingDeadline') or 'now + ({} - now) / 2'.format(deadline)
+
+        pooled = bool(fields.get('pooled'))
+        source = self._template(pooled) \
             .replace('%assertion%', fields['assertion']) \
             .replace('%deadline%', str(deadline)) \
+            .replace('%bettingDeadline%', str(bettingDeadline)) \
             .replace('%feePercent%', str(feePercent)) \
             .replace('%arbiterAddr%', arbiterAddr) \
             .replace('%opponentAddr%', opponentAddr) \
@@ -94,7 +123,7 @@ class Constructor(ConstructorInstance):
         return {
             "result": "success",
             'source': source,
-            'contract_name': "BetMeWrapper"
+            'contract_name': "BetMePoolWrapper" if pooled else "BetMeWrapper"
         }
 
     def post_construct(self, fields, abi_array):
@@ -214,6 +243,18 @@ class Constructor(ConstructorInstance):
                 'description': 'Shows if an owner claimed his payout after dispute judged or failed.',
                 'sorting_order': 210,
             },
+            'Credits': {
+                'title': 'Credited payout',
+                'description': 'Ether amount which could not be sent to the address by settlement. The address takes it with "Get payout" function.',
+                "ui:widget": "ethCount",
+                'inputs': [
+                    {
+                        'title': 'Participant address',
+                        'description': 'Ethereum address of the participant'
+                    },
+                ],
+                'sorting_order': 215,
+            },
             'getTime': {
                 'title': 'Current timestamp',
                 'description': 'Just in case',
@@ -410,6 +451,15 @@ class Constructor(ConstructorInstance):
                     'name': 'currency-eth'
                 },
             },
+            'settle': {
+                'title': 'Settle',
+                'description': 'Anyone can pay out all participants in one transaction after dispute has ended. Payout which can not be sent is credited, and its receiver takes it with "Get payout" function.',
+                'sorting_order': 435,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'cash-multiple'
+                },
+            },
             'deleteContract': {
                 'title': 'Drop contract',
                 'description': 'Owner can drop the contract on some stages (for example, if there is no opponnet found).',
@@ -421,15 +471,278 @@ class Constructor(ConstructorInstance):
             },
         }
 
+        dashboard_functions = ['Assertion', 'Deadline', 'currentBet', 'ArbiterHasVoted']
+
+        if fields.get('pooled'):
+            for name in self._POOL_DROPPED_FUNCTIONS:
+                del function_titles[name]
+            function_titles.update(self._pool_function_titles())
+            dashboard_functions = ['Assertion', 'Deadline', 'TotalTrue', 'TotalFalse', 'ArbiterHasVoted']
+
         return {
             "result": "success",
             'function_specs': function_titles,
-            'dashboard_functions': ['Assertion', 'Deadline', 'currentBet', 'ArbiterHasVoted']
+            'dashboard_functions': dashboard_functions
         }
 
+    def estimate_gas(self, fields):
+        """Quotes gas of deploying `construct(fields)` and of every transaction function.
+
+        Uses the model measured by `python -m tools.calibrate` for the exact
+        template text, see `tools.calibrate.estimate`; a template without one
+        is an error.
+        """
+        pooled = bool(fields.get('pooled'))
+        model = self._gas_models().get(self._template_hash(pooled))
+        if model is None:
+            return {
+                "result": "error",
+                "error_descr": "Gas costs of this template are not calibrated, run python -m tools.calibrate"
+            }
+
+        size = len(fields['assertion'].encode('utf-8'))
+        # short strings share the length slot, long ones keep it apart
+        slots = 1 if size < 32 else 1 + (size + 31) // 32
+
+        def linear(costs):
+            return costs.get('base', 0) + costs.get('per_byte', 0) * size + costs.get('per_slot', 0) * slots
+
+        deploy_gas = linear(model['deploy'])
+        for name, costs in model['deploy_fields'].items():
+            value = fields.get(name)
+            if value:
+                # the literal is pushed by the creation code: an address or a minimal-width number
+                if isinstance(value, str) and value.startswith('0x'):
+                    literal_bytes = 20
+                else:
+                    literal_bytes = max(1, (int(value).bit_length() + 7) // 8)
+                deploy_gas += costs['base'] + costs.get('per_byte', 0) * literal_bytes
+
+        return {
+            "result": "success",
+            'deploy_gas': deploy_gas,
+            'function_gas': {name: linear(costs) for name, costs in model['functions'].items()}
+        }
+
+    def _pool_function_titles(self):
+        state_version_input = {
+            'title': 'State version number',
+            'description': 'Returned by "State version number" function. This field secures you from sudden changes in dispute terms by owner. If specified version not coincides with current, transaction reverts.',
+        }
+        bettor_input = {
+            'title': 'Bettor address',
+            'description': 'Ethereum address of the bettor',
+        }
+
+        return {
+            # View functions
+            'BettingDeadline': {
+                'title': 'Betting deadline',
+                'description': 'Bets are accepted before this point in time, arbiter decides after it and before deadline.',
+                "ui:widget": "unixTime",
+                'sorting_order': 25,
+            },
+            'TotalTrue': {
+                'title': 'Total bets for assertion',
+                'description': 'Ether amount bet by everyone who considers the assertion true.',
+                "ui:widget": "ethCount",
+                'sorting_order': 30,
+            },
+            'TotalFalse': {
+                'title': 'Total bets against assertion',
+                'description': 'Ether amount bet by everyone who considers the assertion false.',
+                "ui:widget": "ethCount",
+                'sorting_order': 35,
+            },
+            'TrueBets': {
+                'title': 'Bet for assertion',
+                'description': 'Ether amount the address bet for the assertion is true.',
+                "ui:widget": "ethCount",
+                'inputs': [bettor_input],
+                'sorting_order': 60,
+            },
+            'FalseBets': {
+                'title': 'Bet against assertion',
+                'description': 'Ether amount the address bet for the assertion is false.',
+                "ui:widget": "ethCount",
+                'inputs': [bettor_input],
+                'sorting_order': 65,
+            },
+            'ArbiterFeeAmountInEther': {
+                'title': 'Arbiter fee in ether',
+                'description': 'Calculated from losing side total and arbiter fee percent, known after arbiter decision.',
+                "ui:widget": "ethCount",
+                'sorting_order': 80,
+            },
+            'payoutOf': {
+                'title': 'Bettor payout',
+                'description': 'Amount of ether to be claimed by the address after dispute judged or failed.',
+                "ui:widget": "ethCount",
+                'inputs': [bettor_input],
+                'sorting_order': 160,
+            },
+            'IsPayoutMade': {
+                'title': 'Bettor claimed payout',
+                'description': 'Shows if the address claimed its payout after dispute judged or failed.',
+                'inputs': [bettor_input],
+                'sorting_order': 190,
+            },
+            # Write functions
+            'setAssertionText': {
+                'title': 'Change assertion text',
+                'description': 'Only owner function. Can be called only before arbiter agreed. Changes statement to bet on.',
+                'inputs': [
+                    {
+                        'title': 'Assertion',
+                        'description': 'Statement to bet on.'
+                    },
+                ],
+                'sorting_order': 300,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'text'
+                },
+            },
+            'setBettingDeadline': {
+                'title': 'Change betting deadline',
+                'description': 'Only owner function. Can be called only before arbiter agreed. Bets are accepted before this point in time, arbiter decides after it. Choose a date and time in the future and before deadline, otherwise transaction will fail.',
+                'inputs': [
+                    {
+                        'title': 'new betting deadline',
+                        'description': 'should be in the future and before deadline',
+                        'ui:widget': 'unixTime'
+                    },
+                ],
+                'sorting_order': 315,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'timer-sand'
+                },
+            },
+            'agreeToBecameArbiter': {
+                'title': 'Agree to be an arbiter',
+                'description': 'Only arbiter function. You agree to became an arbiter for this dispute and send penalty amount (if it is not set to zero by owner). When you agree, all contract\'s terms will freeze and betting opens. You can self retreat before anyone bets.',
+                'payable_details': {
+                    'title': 'Arbiter deposit amount',
+                    'description': 'Ether deposit amount (returned by "Arbiter deposit amount" function) to confim you are to freeze this ether as a guarantee you will judge the dispute. If you will not show, bettors will split it.',
+                },
+                'inputs': [state_version_input],
+                'sorting_order': 370,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'check'
+                },
+            },
+            'arbiterSelfRetreat': {
+                'title': 'Arbiter self retreat',
+                'description': 'Only arbiter function. After arbiter agreed but before anyone bets, arbiter may retreat and get her deposit back.',
+                'sorting_order': 380,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'close'
+                },
+            },
+            'betAssertIsTrue': {
+                'title': 'Bet for assertion',
+                'description': 'Bet the assertion text contains true statement. Open after arbiter agreed and until betting deadline. You can add to your bet, but can not bet on both sides.',
+                'payable_details': {
+                    'title': 'Bet amount',
+                    'description': 'Any positive ether amount.',
+                },
+                'inputs': [state_version_input],
+                'sorting_order': 385,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'check-circle'
+                },
+            },
+            'betAssertIsFalse': {
+                'title': 'Bet against assertion',
+                'description': 'Bet the assertion text contains false statement. Open after arbiter agreed and until betting deadline. You can add to your bet, but can not bet on both sides.',
+                'payable_details': {
+                    'title': 'Bet amount',
+                    'description': 'Any positive ether amount.',
+                },
+                'inputs': [state_version_input],
+                'sorting_order': 390,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'alert-circle'
+                },
+            },
+            'agreeAssertionTrue': {
+                'title': 'Arbiter: assertion is True',
+                'description': 'Only arbiter function. Open between betting deadline and deadline. Arbiter confirms assertion text contains true statement (bets for assertion win). After this function called, participants can claim their payouts.',
+                'sorting_order': 400,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'comment-check-outline'
+                },
+            },
+            'agreeAssertionFalse': {
+                'title': 'Arbiter: assertion is False',
+                'description': 'Only arbiter function. Open between betting deadline and deadline. Arbiter confirms assertion text contains false statement (bets against assertion win). After this function called, participants can claim their payouts.',
+                'sorting_order': 410,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'comment-remove-outline'
+                },
+            },
+            'agreeAssertionUnresolvable': {
+                'title': 'Arbiter: assertion can not be checked',
+                'description': 'Only arbiter function. Open between betting deadline and deadline. Arbiter affirms assertion can not be checked (everybody get their bets and deposits back). After this function called, participants can claim their payouts.',
+                'sorting_order': 420,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'comment-question-outline'
+                },
+            },
+            'deleteContract': {
+                'title': 'Drop contract',
+                'description': 'Owner can drop the contract when no bets are made or all winners claimed their payouts.',
+                'sorting_order': 440,
+                'icon': {
+                    'pack': 'materialdesignicons',
+                    'name': 'delete'
+                },
+            },
+        }
+
+    @classmethod
+    def _template(cls, pooled):
+        return cls._SAFEMATH_SOURCE + (cls._BETME_POOL_SOURCE if pooled else cls._BETME_SOURCE)
+
+    @classmethod
+    def _template_hash(cls, pooled):
+        if pooled not in cls._template_hashes:
+            cls._template_hashes[pooled] = hashlib.sha256(cls._template(pooled).encode('utf-8')).hexdigest()
+        return cls._template_hashes[pooled]
+
+    @classmethod
+    def _gas_models(cls):
+        if cls._gas_table is None:
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), cls._GAS_TABLE)
+            with open(path, encoding='utf-8') as f:
+                cls._gas_table = json.load(f)
+        return cls._gas_table
+
+    # functions of the single opponent contract which BetMePool does not have
+    _POOL_DROPPED_FUNCTIONS = (
+        'currentBet',
+        'OpponentAddress',
+        'IsOpponentBetConfirmed',
+        'ownerPayout',
+        'opponentPayout',
+        'IsOwnerTransferMade',
+        'IsOpponentTransferMade',
+        'setOpponentAddress',
+        'bet',
+        'Credits',
+        'settle',
+    )
 
     # language=Solidity
-    _TEMPLATE = """
+    _SAFEMATH_SOURCE = """
 pragma solidity ^0.4.20;
 
 library SafeMath {
@@ -478,7 +791,10 @@ library SafeMath {
   }
 }
 
-contract BetMe {
+"""
+
+    # language=Solidity
+    _BETME_SOURCE = """contract BetMe {
 	using SafeMath for uint256;
 
 	string public Assertion;
@@ -502,6 +818,9 @@ contract BetMe {
 	bool public IsArbiterTransferMade;
 	bool public IsOpponentTransferMade;
 
+	mapping(address => uint256) public Credits;
+	uint256 private totalCredits;
+
 	function BetMe(
 		string  _assertion,
 		uint256 _deadline,
@@ -707,7 +1026,9 @@ contract BetMe {
 
 	function withdraw() public {
 		require(ArbiterHasVoted || getTime() > Deadline);
-		if (msg.sender == ArbiterAddress) {
+		if (Credits[msg.sender] > 0) {
+			withdrawCredit();
+		} else if (msg.sender == ArbiterAddress) {
 			withdrawArbiter();
 		} else if (msg.sender == OwnerAddress) {
 			withdrawOwner();
@@ -721,17 +1042,12 @@ contract BetMe {
 	function withdrawArbiter() internal {
 		require(!IsArbiterTransferMade);
 		IsArbiterTransferMade = true;
-		if (IsArbiterLazy()) return;
-		uint256 amount = IsArbiterAddressConfirmed ? ArbiterPenaltyAmount : 0;
-		if (ArbiterHasVoted && IsDecisionMade) {
-			amount = amount.add(ArbiterFeeAmountInEther());
-		}
+		uint256 amount = arbiterWithdrawalAmount();
 		if (amount > 0) ArbiterAddress.transfer(amount);
 	}
 
 	function withdrawOwner() internal {
-		require(!IsDecisionMade || IsAssertionTrue);
-		require(!IsOwnerTransferMade);
+		require(IsOwnerTransferPending());
 		IsOwnerTransferMade = true;
 		OwnerAddress.transfer(ownerPayout());
 	}
@@ -742,6 +1058,49 @@ contract BetMe {
 		OpponentAddress.transfer(opponentPayout());
 	}
 
+	// Credits exist because the stipend was not enough for the recipient,
+	// so they are paid with all remaining gas. State is settled beforehand.
+	function withdrawCredit() internal {
+		uint256 amount = Credits[msg.sender];
+		Credits[msg.sender] = 0;
+		totalCredits = totalCredits.sub(amount);
+		require(msg.sender.call.value(amount)());
+	}
+
+	// Pays every party in one transaction. Payments are sent with the 2300 gas
+	// stipend; one that fails is credited to be taken later with withdraw().
+	function settle() public {
+		require(ArbiterHasVoted || getTime() > Deadline);
+		if (!IsArbiterTransferMade) {
+			IsArbiterTransferMade = true;
+			payOrCredit(ArbiterAddress, arbiterWithdrawalAmount());
+		}
+		if (IsOwnerTransferPending()) {
+			IsOwnerTransferMade = true;
+			payOrCredit(OwnerAddress, ownerPayout());
+		}
+		if (IsOpponentTransferPending()) {
+			IsOpponentTransferMade = true;
+			payOrCredit(OpponentAddress, opponentPayout());
+		}
+	}
+
+	function payOrCredit(address _to, uint256 _amount) internal {
+		if (_amount == 0) return;
+		if (!_to.send(_amount)) {
+			Credits[_to] = Credits[_to].add(_amount);
+			totalCredits = totalCredits.add(_amount);
+		}
+	}
+
+	function arbiterWithdrawalAmount() internal view returns (uint256 amount) {
+		if (IsArbiterLazy()) return 0;
+		amount = IsArbiterAddressConfirmed ? ArbiterPenaltyAmount : 0;
+		if (ArbiterHasVoted && IsDecisionMade) {
+			amount = amount.add(ArbiterFeeAmountInEther());
+		}
+	}
+
 	function ArbiterFeeAmountInEther() public view returns (uint256){
 		return betAmount.mul(ArbiterFee).div(1e20);
 	}
@@ -781,6 +1140,10 @@ contract BetMe {
 		}
 	}
 
+	function IsOwnerTransferPending() internal view returns (bool) {
+		return !IsOwnerTransferMade && (!IsDecisionMade || IsAssertionTrue);
+	}
+
 	function IsOpponentTransferPending() internal view returns (bool) {
 		if (IsOpponentTransferMade) return false;
 		if (IsArbiterLazy()) return true;
@@ -791,6 +1154,7 @@ contract BetMe {
 	function deleteContract() public onlyOwner {
 		require(!IsVotingInProgress());
 		require(!IsOpponentTransferPending());
+		require(totalCredits == 0);
 		if (IsArbiterAddressConfirmed && !IsArbiterTransferMade) {
 			withdrawArbiter();
 		}
@@ -800,5 +1164,322 @@ contract BetMe {
 
 contract BetMeWrapper is BetMe("%assertion%", %deadline%, %feePercent%, %arbiterAddr%, %opponentAddr%, %arbiterPenaltyAmount%) {
 %payment_code%
+}
+    """
+
+    # language=Solidity
+    _BETME_POOL_SOURCE = """contract BetMePool {
+	using SafeMath for uint256;
+
+	string public Assertion;
+	uint256 public Deadline;
+	uint256 public BettingDeadline;
+	uint256 public ArbiterFee;
+	uint256 public ArbiterPenaltyAmount;
+
+	uint256 public StateVersion;
+
+	address public OwnerAddress;
+	address public ArbiterAddress;
+
+	mapping(address => uint256) public TrueBets;
+	mapping(address => uint256) public FalseBets;
+	mapping(address => bool) public IsPayoutMade;
+	uint256 public TotalTrue;
+	uint256 public TotalFalse;
+	uint256 private unclaimedTrue;
+	uint256 private unclaimedFalse;
+
+	bool public IsArbiterAddressConfirmed;
+	bool public ArbiterHasVoted;
+	bool public IsDecisionMade;
+	bool public IsAssertionTrue;
+	bool public IsArbiterTransferMade;
+
+	function BetMePool(
+		string  _assertion,
+		uint256 _deadline,
+		uint256 _bettingDeadline,
+		uint256 _fee,
+		address _arbiterAddr,
+		uint256 _arbiterPenaltyAmount
+	) public {
+		OwnerAddress = msg.sender;
+		_setAssertionText(_assertion);
+		_setDeadline(_deadline);
+		_setBettingDeadline(_bettingDeadline);
+		_setArbiterFee(_fee);
+		ArbiterAddress = _arbiterAddr;
+		ArbiterPenaltyAmount = _arbiterPenaltyAmount;
+	}
+
+	modifier onlyOwner() {
+		require(msg.sender == OwnerAddress);
+		_;
+	}
+
+	modifier onlyArbiter() {
+		require(msg.sender == ArbiterAddress);
+		_;
+	}
+
+	modifier forbidArbiter() {
+		require(msg.sender != ArbiterAddress);
+		_;
+	}
+
+	modifier ensureTimeToVote() {
+		require(IsVotingInProgress());
+		_;
+	}
+
+	modifier ensureBettingOpen() {
+		require(IsBettingOpen());
+		_;
+	}
+
+	modifier onlyArbiterCandidate() {
+		require(!IsArbiterAddressConfirmed);
+		require(msg.sender == ArbiterAddress);
+		_;
+	}
+
+	modifier increaseState() {
+		StateVersion = StateVersion.add(1);
+		_;
+	}
+
+	modifier requireArbiterNotConfirmed() {
+		require(!IsArbiterAddressConfirmed);
+		_;
+	}
+
+	modifier stateNumberMatches(uint256 _agreedState) {
+		require(StateVersion == _agreedState);
+		_;
+	}
+
+	modifier requireArbiterConfirmed() {
+		require(IsArbiterAddressConfirmed);
+		_;
+	}
+
+	modifier requireNoBetsMade() {
+		require(TotalTrue == 0 && TotalFalse == 0);
+		_;
+	}
+
+	function IsPoolMatched() internal view returns (bool) {
+		return TotalTrue > 0 && TotalFalse > 0;
+	}
+
+	// Betting closes before voting opens, so nobody can bet on an outcome
+	// which is already known or front-run the arbiter's decision
+	function IsBettingOpen() internal view returns (bool) {
+		return IsArbiterAddressConfirmed && getTime() < BettingDeadline;
+	}
+
+	function IsVotingInProgress() internal view returns (bool) {
+		return IsArbiterAddressConfirmed && !ArbiterHasVoted && IsPoolMatched() &&
+			getTime() >= BettingDeadline && getTime() < Deadline;
+	}
+
+	function IsArbiterLazy() internal view returns (bool) {
+		return (IsPoolMatched() && getTime() > Deadline && !ArbiterHasVoted);
+	}
+
+	function getTime() public view returns (uint256) {
+		return now;
+	}
+
+	function setAssertionText(string _text) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setAssertionText(_text);
+	}
+
+	function _setAssertionText(string _text) internal {
+		require(bytes(_text).length > 0);
+		Assertion = _text;
+	}
+
+	function setDeadline(uint256 _timestamp) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setDeadline(_timestamp);
+	}
+
+	function _setDeadline(uint256 _timestamp) internal {
+		require(_timestamp > getTime());
+		require(_timestamp > BettingDeadline);
+		Deadline = _timestamp;
+	}
+
+	function setBettingDeadline(uint256 _timestamp) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setBettingDeadline(_timestamp);
+	}
+
+	function _setBettingDeadline(uint256 _timestamp) internal {
+		require(_timestamp > getTime());
+		require(_timestamp < Deadline);
+		BettingDeadline = _timestamp;
+	}
+
+	function setArbiterFee(uint256 _percent) public onlyOwner requireArbiterNotConfirmed increaseState {
+		_setArbiterFee(_percent);
+	}
+
+	function _setArbiterFee(uint256 _percent) internal {
+		require(_percent < 100e18); // 100.0% float as integer with decimal=18
+		ArbiterFee = _percent;
+	}
+
+	function setArbiterAddress(address _addr) public onlyOwner requireArbiterNotConfirmed increaseState {
+		require(_addr != address(ArbiterAddress));
+		require(_addr != address(OwnerAddress));
+		ArbiterAddress = _addr;
+	}
+
+	function setArbiterPenaltyAmount(uint256 _amount) public onlyOwner requireArbiterNotConfirmed increaseState {
+		require(_amount != ArbiterPenaltyAmount);
+		ArbiterPenaltyAmount = _amount;
+	}
+
+	function agreeToBecameArbiter(uint256 _agreedState) public payable
+		onlyArbiterCandidate
+		stateNumberMatches(_agreedState)
+	{
+		require(ArbiterAddress != address(0));
+		require(msg.value == ArbiterPenaltyAmount);
+		IsArbiterAddressConfirmed = true;
+	}
+
+	function arbiterSelfRetreat() public onlyArbiter requireArbiterConfirmed requireNoBetsMade {
+		IsArbiterAddressConfirmed = false;
+		if (ArbiterPenaltyAmount > 0 ) {
+			ArbiterAddress.transfer(ArbiterPenaltyAmount);
+		}
+	}
+
+	function betAssertIsTrue(uint256 _agreedState) public payable
+		ensureBettingOpen
+		forbidArbiter
+		stateNumberMatches(_agreedState)
+	{
+		require(msg.value > 0);
+		require(FalseBets[msg.sender] == 0);
+		TrueBets[msg.sender] = TrueBets[msg.sender].add(msg.value);
+		TotalTrue = TotalTrue.add(msg.value);
+		unclaimedTrue = unclaimedTrue.add(msg.value);
+	}
+
+	function betAssertIsFalse(uint256 _agreedState) public payable
+		ensureBettingOpen
+		forbidArbiter
+		stateNumberMatches(_agreedState)
+	{
+		require(msg.value > 0);
+		require(TrueBets[msg.sender] == 0);
+		FalseBets[msg.sender] = FalseBets[msg.sender].add(msg.value);
+		TotalFalse = TotalFalse.add(msg.value);
+		unclaimedFalse = unclaimedFalse.add(msg.value);
+	}
+
+	function agreeAssertionTrue() public onlyArbiter ensureTimeToVote {
+		ArbiterHasVoted = true;
+		IsDecisionMade = true;
+		IsAssertionTrue = true;
+	}
+
+	function agreeAssertionFalse() public onlyArbiter ensureTimeToVote {
+		ArbiterHasVoted = true;
+		IsDecisionMade = true;
+	}
+
+	function agreeAssertionUnresolvable() public onlyArbiter ensureTimeToVote {
+		ArbiterHasVoted = true;
+	}
+
+	function withdraw() public {
+		require(ArbiterHasVoted || getTime() > Deadline);
+		if (msg.sender == ArbiterAddress) {
+			withdrawArbiter();
+		} else {
+			withdrawBettor();
+		}
+	}
+
+	function withdrawArbiter() internal {
+		require(!IsArbiterTransferMade);
+		IsArbiterTransferMade = true;
+		if (IsArbiterLazy()) return;
+		uint256 amount = IsArbiterAddressConfirmed ? ArbiterPenaltyAmount : 0;
+		if (ArbiterHasVoted && IsDecisionMade) {
+			amount = amount.add(ArbiterFeeAmountInEther());
+		}
+		if (amount > 0) ArbiterAddress.transfer(amount);
+	}
+
+	function withdrawBettor() internal {
+		require(!IsPayoutMade[msg.sender]);
+		uint256 amount = payoutOf(msg.sender);
+		require(amount > 0);
+		IsPayoutMade[msg.sender] = true;
+		unclaimedTrue = unclaimedTrue.sub(TrueBets[msg.sender]);
+		unclaimedFalse = unclaimedFalse.sub(FalseBets[msg.sender]);
+		msg.sender.transfer(amount);
+	}
+
+	function WinningTotal() internal view returns (uint256) {
+		return IsAssertionTrue ? TotalTrue : TotalFalse;
+	}
+
+	function LosingTotal() internal view returns (uint256) {
+		return IsAssertionTrue ? TotalFalse : TotalTrue;
+	}
+
+	// Fee is charged on the losing pool, so it is known only after decision
+	function ArbiterFeeAmountInEther() public view returns (uint256) {
+		if (!IsDecisionMade) return 0;
+		return LosingTotal().mul(ArbiterFee).div(1e20);
+	}
+
+	function payoutOf(address _addr) public view returns (uint256) {
+		uint256 stake = TrueBets[_addr].add(FalseBets[_addr]);
+		if (IsArbiterLazy()) {
+			return stake.add(ArbiterPenaltyAmount.mul(stake).div(TotalTrue.add(TotalFalse)));
+		}
+		if (ArbiterHasVoted && IsDecisionMade) {
+			uint256 winningStake = IsAssertionTrue ? TrueBets[_addr] : FalseBets[_addr];
+			uint256 prize = LosingTotal().sub(ArbiterFeeAmountInEther());
+			return winningStake.add(prize.mul(winningStake).div(WinningTotal()));
+		}
+		return stake;
+	}
+
+	function arbiterPayout() public view returns (uint256 amount) {
+		if (IsArbiterLazy()) return 0;
+		if (ArbiterHasVoted && IsDecisionMade) {
+			amount = ArbiterFeeAmountInEther();
+		}
+		if (IsArbiterAddressConfirmed) {
+			amount = amount.add(ArbiterPenaltyAmount);
+		}
+	}
+
+	function IsPayoutPending() internal view returns (bool) {
+		if (IsDecisionMade) {
+			return (IsAssertionTrue ? unclaimedTrue : unclaimedFalse) > 0;
+		}
+		return unclaimedTrue.add(unclaimedFalse) > 0;
+	}
+
+	function deleteContract() public onlyOwner {
+		require(!IsPayoutPending());
+		if (IsArbiterAddressConfirmed && !IsArbiterTransferMade) {
+			withdrawArbiter();
+		}
+		selfdestruct(OwnerAddress);
+	}
+}
+
+contract BetMePoolWrapper is BetMePool("%assertion%", %deadline%, %bettingDeadline%, %feePercent%, %arbiterAddr%, %arbiterPenaltyAmount%) {
+%payment_code%
 }
     """
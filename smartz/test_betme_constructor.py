@@ -0,0 +1,64 @@
+"""Tests of the BetMe constructor, run with `python -m pytest smartz`.
+
+Needs the smartz platform package the constructor is written against.
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip('smartz.api.constructor_engine')
+
+_spec = importlib.util.spec_from_file_location(
+    'betme_constructor', os.path.join(os.path.dirname(__file__), 'betme_constructor.py'))
+betme_constructor = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(betme_constructor)
+
+Constructor = betme_constructor.Constructor
+
+FIELDS = {'assertion': 'Norman can light his Zippo', 'deadline': 1600000000}
+
+
+def test_pooled_specs_drop_single_opponent_functions():
+    specs = Constructor().post_construct(dict(FIELDS, pooled=True), [])['function_specs']
+    assert not set(Constructor._POOL_DROPPED_FUNCTIONS).intersection(specs)
+    assert {'TotalTrue', 'TotalFalse', 'BettingDeadline', 'setBettingDeadline', 'payoutOf'} <= set(specs)
+
+    specs = Constructor().post_construct(FIELDS, [])['function_specs']
+    assert set(Constructor._POOL_DROPPED_FUNCTIONS) <= set(specs)
+    assert 'BettingDeadline' not in specs
+
+
+def test_pooled_betting_closes_halfway_to_deadline_by_default():
+    result = Constructor().construct(dict(FIELDS, pooled=True))
+    assert result['contract_name'] == 'BetMePoolWrapper'
+    assert 'contract BetMePoolWrapper is BetMePool("Norman can light his Zippo", 1600000000, ' \
+           'now + (1600000000 - now) / 2, 0, address(0), 0)' in result['source']
+
+    result = Constructor().construct(dict(FIELDS, pooled=True, bettingDeadline=1590000000))
+    assert 'BetMePool("Norman can light his Zippo", 1600000000, 1590000000, ' in result['source']
+
+
+def test_single_opponent_source_is_unchanged_by_pool_fields():
+    result = Constructor().construct(dict(FIELDS, bettingDeadline=1590000000))
+    assert result['contract_name'] == 'BetMeWrapper'
+    assert 'BetMePool' not in result['source']
+    assert '1590000000' not in result['source']
+
+
+def test_gas_estimate_follows_calibration_table(monkeypatch):
+    from tools.calibrate import estimate, template_hash
+
+    model = {
+        'deploy': {'base': 1500000, 'per_byte': 68, 'per_slot': 20000},
+        'deploy_fields': {'arbiterAddr': {'base': 3000}, 'feePercent': {'base': 200, 'per_byte': 68}},
+        'functions': {'withdraw': {'base': 25000}},
+    }
+    monkeypatch.setattr(Constructor, '_gas_table', {template_hash(Constructor, False): model})
+    fields = dict(FIELDS, arbiterAddr='0x' + '11' * 20, feePercent=10 ** 18)
+
+    quote = Constructor().estimate_gas(fields)
+    assert quote['result'] == 'success'
+    assert (quote['deploy_gas'], quote['function_gas']) == estimate(model, fields)
+    assert Constructor().estimate_gas(dict(fields, pooled=True))['result'] == 'error'
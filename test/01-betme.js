@@ -12,6 +12,7 @@ chai.should();
 const BetMe = artifacts.require("BetMe");
 const MockBetMe = artifacts.require("MockBetMe");
 const UnpayableArbiter = artifacts.require("UnpayableArbiter");
+const GasHungryArbiter = artifacts.require("GasHungryArbiter");
 
 function daysInFutureTimestamp(days) {
 	const now = new Date();
@@ -2156,3 +2157,149 @@ contract('BetMe - example expected flow', function(accounts) {
 	});
 
 });
+
+contract('BetMe - settlement', function(accounts) {
+	const acc = {anyone: accounts[0], owner: accounts[1], opponent: accounts[2], arbiter: accounts[3]};
+	const gasPrice = 10;
+	const betOpt = {
+		betAmount:     web3.toWei('55', 'finney'),
+		feePercent:    web3.toWei('10.0'),
+		penaltyAmount: web3.toWei('20', 'finney'),
+	};
+
+	beforeEach(async function () {
+		this.inst = await MockBetMe.new(...constructorArgs(), {from: acc.owner},);
+	});
+
+	it('should not allow to settle before arbiter voted or deadline passed', async function() {
+		const testCase = newBetCase(this.inst, acc, betOpt);
+		await testCase.preconditionOpponentBetIsMade();
+		await expectThrow(this.inst.settle({from: acc.anyone}));
+	});
+
+	it('should pay every participant in one transaction', async function() {
+		const testCase = newBetCase(this.inst, acc, betOpt);
+		await testCase.preconditionOpponentBetIsMade();
+		await testCase.agreeAssertionUnresolvable();
+
+		const callInfo = {func: this.inst.settle, args: [], address: acc.anyone, gasPrice};
+		await assertBalanceDiff(callInfo, 0, {
+			[acc.owner]:    web3.toWei('55', 'finney'),
+			[acc.opponent]: web3.toWei('55', 'finney'),
+			[acc.arbiter]:  web3.toWei('20', 'finney'),
+		});
+		web3.eth.getBalance(this.inst.address).should.be.bignumber.equal(0);
+		await this.inst.IsOwnerTransferMade().should.eventually.be.true;
+		await this.inst.IsOpponentTransferMade().should.eventually.be.true;
+		await this.inst.IsArbiterTransferMade().should.eventually.be.true;
+	});
+
+	it('should pay winner and arbiter fee on settle', async function() {
+		const testCase = newBetCase(this.inst, acc, betOpt);
+		await testCase.preconditionOpponentBetIsMade();
+		await testCase.agreeAssertionFalse();
+
+		const callInfo = {func: this.inst.settle, args: [], address: acc.anyone, gasPrice};
+		await assertBalanceDiff(callInfo, 0, {
+			[acc.owner]:    0,
+			[acc.opponent]: web3.toWei('104.5', 'finney'),
+			[acc.arbiter]:  web3.toWei('25.5', 'finney'),
+		});
+		web3.eth.getBalance(this.inst.address).should.be.bignumber.equal(0);
+	});
+
+	it('should not pay twice after withdraw or repeated settle', async function() {
+		const testCase = newBetCase(this.inst, acc, betOpt);
+		await testCase.preconditionOpponentBetIsMade();
+		await testCase.agreeAssertionUnresolvable();
+		await this.inst.withdraw({from: acc.owner}).should.be.eventually.fulfilled;
+
+		const callInfo = {func: this.inst.settle, args: [], address: acc.anyone, gasPrice};
+		await assertBalanceDiff(callInfo, 0, {
+			[acc.owner]:    0,
+			[acc.opponent]: web3.toWei('55', 'finney'),
+			[acc.arbiter]:  web3.toWei('20', 'finney'),
+		});
+		await assertBalanceDiff(callInfo, 0, {[acc.owner]: 0, [acc.opponent]: 0, [acc.arbiter]: 0});
+		await expectThrow(this.inst.withdraw({from: acc.opponent}));
+	});
+
+	it('should credit payment which can not be sent and still pay others', async function() {
+		const arbiter = await UnpayableArbiter.new(this.inst.address, {from: acc.owner});
+		const testCase = newBetCase(this.inst, acc, {});
+		await testCase.bet(web3.toWei('0.5'));
+		await testCase.setArbiterAddress(arbiter.address);
+		const penaltyAmount = web3.toWei('0.003');
+		await testCase.setArbiterPenaltyAmount(penaltyAmount);
+		await arbiter.agreeToBecameArbiter({from: acc.anyone, value: penaltyAmount}).should.eventually.be.fulfilled;
+		await testCase.setTimeAfterDeadline();
+
+		const callInfo = {func: this.inst.settle, args: [], address: acc.anyone, gasPrice};
+		await assertBalanceDiff(callInfo, 0, {[acc.owner]: web3.toWei('0.5')});
+		await this.inst.IsArbiterTransferMade().should.eventually.be.true;
+		await this.inst.Credits(arbiter.address).should.eventually.be.bignumber.equal(penaltyAmount);
+		web3.eth.getBalance(this.inst.address).should.be.bignumber.equal(penaltyAmount);
+		await expectThrow(this.inst.deleteContract({from: acc.owner}));
+	});
+
+	it('should let credited participant take payment with withdraw', async function() {
+		const arbiter = await UnpayableArbiter.new(this.inst.address, {from: acc.owner});
+		const testCase = newBetCase(this.inst, acc, {});
+		await testCase.bet(web3.toWei('0.5'));
+		await testCase.setArbiterAddress(arbiter.address);
+		const penaltyAmount = web3.toWei('0.003');
+		await testCase.setArbiterPenaltyAmount(penaltyAmount);
+		await arbiter.agreeToBecameArbiter({from: acc.anyone, value: penaltyAmount}).should.eventually.be.fulfilled;
+		await testCase.setTimeAfterDeadline();
+		await this.inst.settle({from: acc.anyone}).should.be.eventually.fulfilled;
+
+		await arbiter.setAcceptPayments(true, {from: acc.anyone}).should.be.eventually.fulfilled;
+		await arbiter.withdraw({from: acc.anyone}).should.be.eventually.fulfilled;
+		web3.eth.getBalance(arbiter.address).should.be.bignumber.equal(penaltyAmount);
+		await this.inst.Credits(arbiter.address).should.eventually.be.bignumber.zero;
+		await expectThrow(arbiter.withdraw({from: acc.anyone}));
+		await this.inst.deleteContract({from: acc.owner}).should.be.eventually.fulfilled;
+	});
+
+	it('should pay credit to recipient which needs more than gas stipend', async function() {
+		const arbiter = await GasHungryArbiter.new(this.inst.address, {from: acc.owner});
+		const testCase = newBetCase(this.inst, acc, {});
+		await testCase.bet(web3.toWei('0.5'));
+		await testCase.setArbiterAddress(arbiter.address);
+		const penaltyAmount = web3.toWei('0.003');
+		await testCase.setArbiterPenaltyAmount(penaltyAmount);
+		await arbiter.agreeToBecameArbiter({from: acc.anyone, value: penaltyAmount}).should.eventually.be.fulfilled;
+		await testCase.setTimeAfterDeadline();
+
+		// settle() sends with the stipend only, which is not enough to receive
+		await this.inst.settle({from: acc.anyone}).should.be.eventually.fulfilled;
+		await this.inst.Credits(arbiter.address).should.eventually.be.bignumber.equal(penaltyAmount);
+		await arbiter.PaymentsReceived().should.eventually.be.bignumber.zero;
+
+		await arbiter.withdraw({from: acc.anyone}).should.be.eventually.fulfilled;
+		await arbiter.PaymentsReceived().should.eventually.be.bignumber.equal(1);
+		web3.eth.getBalance(arbiter.address).should.be.bignumber.equal(penaltyAmount);
+		await this.inst.Credits(arbiter.address).should.eventually.be.bignumber.zero;
+		await this.inst.deleteContract({from: acc.owner}).should.be.eventually.fulfilled;
+	});
+
+	it('should spend less gas to settle than to withdraw three times', async function() {
+		const testCase = newBetCase(this.inst, acc, betOpt);
+		await testCase.preconditionOpponentBetIsMade();
+		await testCase.agreeAssertionUnresolvable();
+		const settleGas = (await this.inst.settle({from: acc.anyone})).receipt.gasUsed;
+
+		const other = await MockBetMe.new(...constructorArgs(), {from: acc.owner},);
+		const otherCase = newBetCase(other, acc, betOpt);
+		await otherCase.preconditionOpponentBetIsMade();
+		await otherCase.agreeAssertionUnresolvable();
+		const withdrawGas = [];
+		for (const from of [acc.owner, acc.opponent, acc.arbiter]) {
+			withdrawGas.push((await other.withdraw({from})).receipt.gasUsed);
+		}
+		const withdrawTotal = withdrawGas.reduce((a, b) => a + b);
+
+		console.log(`\tthree-party settlement gas: settle() ${settleGas}, withdraw() ${withdrawGas.join(' + ')} = ${withdrawTotal}`);
+		settleGas.should.be.below(withdrawTotal);
+	});
+});
@@ -0,0 +1,283 @@
+'use strict';
+
+import expectThrow from '../node_modules/openzeppelin-solidity/test/helpers/expectThrow';
+
+const BigNumber = web3.BigNumber;
+const chai =require('chai');
+chai.use(require('chai-bignumber')(BigNumber));
+chai.use(require('chai-as-promised')); // Order is important
+chai.should();
+
+const BetMePool = artifacts.require("BetMePool");
+const MockBetMePool = artifacts.require("MockBetMePool");
+
+function daysInFutureTimestamp(days) {
+	const now = new Date();
+	const futureDate = new Date(+now + 86400 * days);
+	return Math.trunc(futureDate.getTime()/1000);
+}
+
+const defaultAssertion = "Norman can light his Zippo cigarette lighter ten times in a row";
+const defaultDeadlineDate = daysInFutureTimestamp(14);
+const defaultBettingDeadlineDate = daysInFutureTimestamp(7);
+const defaultArbiterFee = web3.toWei('10');
+const defaultArbiterPenaltyAmount = web3.toWei('30', 'finney');
+const zeroAddr = '0x0000000000000000000000000000000000000000';
+const gasPrice = 1000;
+
+function constructorArgs(defaults) {
+	defaults = defaults == null ? {} : defaults;
+	return [
+		('Assertion' in defaults ? defaults.Assertion : defaultAssertion),
+		('Deadline' in defaults ? defaults.Deadline : defaultDeadlineDate),
+		('BettingDeadline' in defaults ? defaults.BettingDeadline : defaultBettingDeadlineDate),
+		('ArbiterFee' in defaults ? defaults.ArbiterFee : defaultArbiterFee),
+		('ArbiterAddress' in defaults ? defaults.ArbiterAddress : zeroAddr),
+		('ArbiterPenaltyAmount' in defaults ? defaults.ArbiterPenaltyAmount : defaultArbiterPenaltyAmount),
+	];
+}
+
+async function expectNoContract(promise) {
+	const patternString = "is not a contract address";
+  try { await promise; } catch (error) {
+		error.message.should.contain(patternString);
+		return;
+  }
+	assert.fail(null, null, 'promise expected to fail with error containing "' + patternString + '", but it does not');
+};
+
+async function assertWithdrawal(inst, address, wantEtherDiff) {
+	const etherBefore = web3.eth.getBalance(address);
+	const ret = await inst.withdraw({from: address, gasPrice});
+	const etherUsed = (new BigNumber(ret.receipt.gasUsed)).mul(gasPrice);
+	web3.eth.getBalance(address).sub(etherBefore).add(etherUsed).should.be.bignumber.equal(wantEtherDiff);
+}
+
+async function agreeToBecameArbiter(inst, acc) {
+	const penaltyAmount = await inst.ArbiterPenaltyAmount();
+	const stateVersion = await inst.StateVersion();
+	await inst.agreeToBecameArbiter(stateVersion, {from: acc.arbiter, value: penaltyAmount}).should.be.eventually.fulfilled;
+}
+
+async function betTrue(inst, from, value) {
+	const stateVersion = await inst.StateVersion();
+	await inst.betAssertIsTrue(stateVersion, {from, value}).should.be.eventually.fulfilled;
+}
+
+async function betFalse(inst, from, value) {
+	const stateVersion = await inst.StateVersion();
+	await inst.betAssertIsFalse(stateVersion, {from, value}).should.be.eventually.fulfilled;
+}
+
+// true side: 1 + 3 ether, false side: 2 ether
+async function preconditionPoolIsMatched(inst, acc) {
+	await agreeToBecameArbiter(inst, acc);
+	await betTrue(inst, acc.owner, web3.toWei('1'));
+	await betTrue(inst, acc.bettor1, web3.toWei('3'));
+	await betFalse(inst, acc.bettor2, web3.toWei('2'));
+}
+
+async function closeBetting(inst, acc) {
+	await inst.setTime(defaultBettingDeadlineDate, {from: acc.anyone}).should.be.eventually.fulfilled;
+}
+
+contract('BetMePool - setup and betting', function(accounts) {
+	const acc = {anyone: accounts[0], owner: accounts[1], arbiter: accounts[2], bettor1: accounts[3], bettor2: accounts[4]};
+
+	beforeEach(async function () {
+		this.inst = await MockBetMePool.new(...constructorArgs({ArbiterAddress: acc.arbiter}), {from: acc.owner});
+	});
+
+	it('should provide public getters for constructor args', async function() {
+		const inst = await BetMePool.new(...constructorArgs({ArbiterAddress: acc.arbiter}), {from: acc.owner});
+		await inst.Assertion().should.eventually.be.equal(defaultAssertion);
+		await inst.Deadline().should.eventually.be.bignumber.equal(defaultDeadlineDate);
+		await inst.BettingDeadline().should.eventually.be.bignumber.equal(defaultBettingDeadlineDate);
+		await inst.ArbiterFee().should.eventually.be.bignumber.equal(defaultArbiterFee);
+		await inst.ArbiterAddress().should.eventually.be.equal(acc.arbiter);
+		await inst.ArbiterPenaltyAmount().should.eventually.be.bignumber.equal(defaultArbiterPenaltyAmount);
+		await inst.OwnerAddress().should.eventually.be.equal(acc.owner);
+	});
+
+	it('should not allow betting deadline outside of now and deadline', async function() {
+		await expectThrow(BetMePool.new(...constructorArgs({BettingDeadline: defaultDeadlineDate}), {from: acc.owner}));
+		await expectThrow(BetMePool.new(...constructorArgs({BettingDeadline: daysInFutureTimestamp(-1)}), {from: acc.owner}));
+		await expectThrow(this.inst.setBettingDeadline(daysInFutureTimestamp(15), {from: acc.owner}));
+		await expectThrow(this.inst.setDeadline(daysInFutureTimestamp(6), {from: acc.owner}));
+		await this.inst.setBettingDeadline(daysInFutureTimestamp(3), {from: acc.owner}).should.be.eventually.fulfilled;
+		await this.inst.setDeadline(daysInFutureTimestamp(6), {from: acc.owner}).should.be.eventually.fulfilled;
+	});
+
+	it('should not allow to bet before arbiter agreed', async function() {
+		const stateVersion = await this.inst.StateVersion();
+		await expectThrow(this.inst.betAssertIsTrue(stateVersion, {from: acc.bettor1, value: web3.toWei('1')}));
+		await expectThrow(this.inst.betAssertIsFalse(stateVersion, {from: acc.bettor2, value: web3.toWei('1')}));
+	});
+
+	it('should freeze terms after arbiter agreed', async function() {
+		await agreeToBecameArbiter(this.inst, acc);
+		await expectThrow(this.inst.setAssertionText("other text", {from: acc.owner}));
+		await expectThrow(this.inst.setDeadline(daysInFutureTimestamp(20), {from: acc.owner}));
+		await expectThrow(this.inst.setBettingDeadline(daysInFutureTimestamp(10), {from: acc.owner}));
+		await expectThrow(this.inst.setArbiterFee(web3.toWei('5'), {from: acc.owner}));
+		await expectThrow(this.inst.setArbiterPenaltyAmount(0, {from: acc.owner}));
+	});
+
+	it('should accumulate bets of many bettors on each side', async function() {
+		await preconditionPoolIsMatched(this.inst, acc);
+		await betTrue(this.inst, acc.bettor1, web3.toWei('1'));
+		await this.inst.TotalTrue().should.eventually.be.bignumber.equal(web3.toWei('5'));
+		await this.inst.TotalFalse().should.eventually.be.bignumber.equal(web3.toWei('2'));
+		await this.inst.TrueBets(acc.bettor1).should.eventually.be.bignumber.equal(web3.toWei('4'));
+		await this.inst.FalseBets(acc.bettor2).should.eventually.be.bignumber.equal(web3.toWei('2'));
+	});
+
+	it('should not allow to bet on both sides', async function() {
+		await preconditionPoolIsMatched(this.inst, acc);
+		const stateVersion = await this.inst.StateVersion();
+		await expectThrow(this.inst.betAssertIsFalse(stateVersion, {from: acc.bettor1, value: web3.toWei('1')}));
+		await expectThrow(this.inst.betAssertIsTrue(stateVersion, {from: acc.bettor2, value: web3.toWei('1')}));
+	});
+
+	it('should not allow arbiter to bet', async function() {
+		await agreeToBecameArbiter(this.inst, acc);
+		const stateVersion = await this.inst.StateVersion();
+		await expectThrow(this.inst.betAssertIsTrue(stateVersion, {from: acc.arbiter, value: web3.toWei('1')}));
+	});
+
+	it('should not allow zero bet or bet with wrong state version', async function() {
+		await agreeToBecameArbiter(this.inst, acc);
+		const stateVersion = await this.inst.StateVersion();
+		await expectThrow(this.inst.betAssertIsTrue(stateVersion, {from: acc.bettor1, value: 0}));
+		await expectThrow(this.inst.betAssertIsTrue(stateVersion.add(1), {from: acc.bettor1, value: web3.toWei('1')}));
+	});
+
+	it('should not allow arbiter to vote while one side is empty', async function() {
+		await agreeToBecameArbiter(this.inst, acc);
+		await betTrue(this.inst, acc.bettor1, web3.toWei('1'));
+		await closeBetting(this.inst, acc);
+		await expectThrow(this.inst.agreeAssertionTrue({from: acc.arbiter}));
+	});
+
+	it('should not allow arbiter to vote before betting deadline', async function() {
+		await preconditionPoolIsMatched(this.inst, acc);
+		await expectThrow(this.inst.agreeAssertionTrue({from: acc.arbiter}));
+		await expectThrow(this.inst.agreeAssertionFalse({from: acc.arbiter}));
+		await expectThrow(this.inst.agreeAssertionUnresolvable({from: acc.arbiter}));
+	});
+
+	it('should not allow to bet after betting deadline', async function() {
+		await preconditionPoolIsMatched(this.inst, acc);
+		await this.inst.setTime(defaultBettingDeadlineDate - 1, {from: acc.anyone}).should.be.eventually.fulfilled;
+		await betFalse(this.inst, acc.anyone, web3.toWei('1'));
+		await closeBetting(this.inst, acc);
+		const stateVersion = await this.inst.StateVersion();
+		await expectThrow(this.inst.betAssertIsTrue(stateVersion, {from: acc.bettor1, value: web3.toWei('1')}));
+		await expectThrow(this.inst.betAssertIsFalse(stateVersion, {from: acc.anyone, value: web3.toWei('1')}));
+		await this.inst.TotalTrue().should.eventually.be.bignumber.equal(web3.toWei('4'));
+		await this.inst.TotalFalse().should.eventually.be.bignumber.equal(web3.toWei('3'));
+	});
+
+	it('should allow arbiter self retreat only before any bet', async function() {
+		await agreeToBecameArbiter(this.inst, acc);
+		await betTrue(this.inst, acc.bettor1, web3.toWei('1'));
+		await expectThrow(this.inst.arbiterSelfRetreat({from: acc.arbiter}));
+	});
+
+	it('should not allow to bet after arbiter voted', async function() {
+		await preconditionPoolIsMatched(this.inst, acc);
+		await closeBetting(this.inst, acc);
+		await this.inst.agreeAssertionTrue({from: acc.arbiter}).should.be.eventually.fulfilled;
+		const stateVersion = await this.inst.StateVersion();
+		await expectThrow(this.inst.betAssertIsFalse(stateVersion, {from: acc.anyone, value: web3.toWei('1')}));
+	});
+});
+
+contract('BetMePool - payouts', function(accounts) {
+	const acc = {anyone: accounts[0], owner: accounts[1], arbiter: accounts[2], bettor1: accounts[3], bettor2: accounts[4]};
+
+	beforeEach(async function () {
+		this.inst = await MockBetMePool.new(...constructorArgs({ArbiterAddress: acc.arbiter}), {from: acc.owner});
+		await preconditionPoolIsMatched(this.inst, acc);
+		await closeBetting(this.inst, acc);
+	});
+
+	it('should split losing pool pro rata between winners minus arbiter fee', async function() {
+		await this.inst.agreeAssertionTrue({from: acc.arbiter}).should.be.eventually.fulfilled;
+		// losing pool is 2 ether, fee 10% of it: 0.2 ether, prize 1.8 ether split 1:3
+		await this.inst.ArbiterFeeAmountInEther().should.eventually.be.bignumber.equal(web3.toWei('0.2'));
+		await this.inst.payoutOf(acc.owner).should.eventually.be.bignumber.equal(web3.toWei('1.45'));
+		await this.inst.payoutOf(acc.bettor1).should.eventually.be.bignumber.equal(web3.toWei('4.35'));
+		await this.inst.payoutOf(acc.bettor2).should.eventually.be.bignumber.zero;
+
+		await assertWithdrawal(this.inst, acc.owner, web3.toWei('1.45'));
+		await assertWithdrawal(this.inst, acc.bettor1, web3.toWei('4.35'));
+		await assertWithdrawal(this.inst, acc.arbiter, web3.toWei('0.23'));
+		await expectThrow(this.inst.withdraw({from: acc.bettor2}));
+		web3.eth.getBalance(this.inst.address).should.be.bignumber.zero;
+	});
+
+	it('should pay whole pool to the only winner when assertion is false', async function() {
+		await this.inst.agreeAssertionFalse({from: acc.arbiter}).should.be.eventually.fulfilled;
+		// losing pool is 4 ether, fee 0.4 ether
+		await assertWithdrawal(this.inst, acc.bettor2, web3.toWei('5.6'));
+		await assertWithdrawal(this.inst, acc.arbiter, web3.toWei('0.43'));
+		await expectThrow(this.inst.withdraw({from: acc.owner}));
+		await expectThrow(this.inst.withdraw({from: acc.bettor1}));
+	});
+
+	it('should return bets and deposit when assertion is unresolvable', async function() {
+		await this.inst.agreeAssertionUnresolvable({from: acc.arbiter}).should.be.eventually.fulfilled;
+		await assertWithdrawal(this.inst, acc.owner, web3.toWei('1'));
+		await assertWithdrawal(this.inst, acc.bettor1, web3.toWei('3'));
+		await assertWithdrawal(this.inst, acc.bettor2, web3.toWei('2'));
+		await assertWithdrawal(this.inst, acc.arbiter, defaultArbiterPenaltyAmount);
+	});
+
+	it('should split lazy arbiter deposit pro rata between all bettors', async function() {
+		await this.inst.setTime(defaultDeadlineDate + 1, {from: acc.anyone}).should.be.eventually.fulfilled;
+		// 30 finney split 1:3:2
+		await assertWithdrawal(this.inst, acc.owner, web3.toWei('1.005'));
+		await assertWithdrawal(this.inst, acc.bettor1, web3.toWei('3.015'));
+		await assertWithdrawal(this.inst, acc.bettor2, web3.toWei('2.01'));
+		await assertWithdrawal(this.inst, acc.arbiter, 0);
+		web3.eth.getBalance(this.inst.address).should.be.bignumber.zero;
+	});
+
+	it('should not allow to claim twice', async function() {
+		await this.inst.agreeAssertionTrue({from: acc.arbiter}).should.be.eventually.fulfilled;
+		await this.inst.withdraw({from: acc.bettor1}).should.be.eventually.fulfilled;
+		await this.inst.IsPayoutMade(acc.bettor1).should.eventually.be.true;
+		await expectThrow(this.inst.withdraw({from: acc.bettor1}));
+	});
+
+	it('should not allow to claim before decision or deadline', async function() {
+		await expectThrow(this.inst.withdraw({from: acc.bettor1}));
+	});
+
+	it('should not allow owner to delete contract while winners did not claim', async function() {
+		await this.inst.agreeAssertionTrue({from: acc.arbiter}).should.be.eventually.fulfilled;
+		await this.inst.withdraw({from: acc.owner}).should.be.eventually.fulfilled;
+		await expectThrow(this.inst.deleteContract({from: acc.owner}));
+		await this.inst.withdraw({from: acc.bettor1}).should.be.eventually.fulfilled;
+		await this.inst.deleteContract({from: acc.owner}).should.be.eventually.fulfilled;
+		await expectNoContract(this.inst.OwnerAddress({from: acc.anyone}));
+	});
+});
+
+contract('BetMePool - unmatched pool', function(accounts) {
+	const acc = {anyone: accounts[0], owner: accounts[1], arbiter: accounts[2], bettor1: accounts[3], bettor2: accounts[4]};
+
+	it('should refund bettors and arbiter deposit if nobody took the other side', async function() {
+		const inst = await MockBetMePool.new(...constructorArgs({ArbiterAddress: acc.arbiter}), {from: acc.owner});
+		await agreeToBecameArbiter(inst, acc);
+		await betTrue(inst, acc.bettor1, web3.toWei('1'));
+		await betTrue(inst, acc.bettor2, web3.toWei('2'));
+		await inst.setTime(defaultDeadlineDate + 1, {from: acc.anyone}).should.be.eventually.fulfilled;
+
+		await assertWithdrawal(inst, acc.bettor1, web3.toWei('1'));
+		await assertWithdrawal(inst, acc.bettor2, web3.toWei('2'));
+		await assertWithdrawal(inst, acc.arbiter, defaultArbiterPenaltyAmount);
+		web3.eth.getBalance(inst.address).should.be.bignumber.zero;
+	});
+});
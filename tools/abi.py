@@ -0,0 +1,97 @@
+"""Minimal ABI encoding for BetMe constructor arguments."""
+
+ZERO_ADDR = '0x0000000000000000000000000000000000000000'
+
+BETME_CONSTRUCTOR_TYPES = ('string', 'uint256', 'uint256', 'address', 'address', 'uint256')
+
+
+def strip_0x(value):
+    return value[2:] if value.startswith('0x') else value
+
+
+def encode_uint256(value):
+    value = int(value)
+    if value < 0 or value >= 2 ** 256:
+        raise ValueError('uint256 out of range: {}'.format(value))
+    return value.to_bytes(32, 'big')
+
+
+def encode_address(value):
+    raw = bytes.fromhex(strip_0x(value))
+    if len(raw) != 20:
+        raise ValueError('bad address: {}'.format(value))
+    return raw.rjust(32, b'\0')
+
+
+def encode_bytes(value):
+    padded = value + b'\0' * (-len(value) % 32)
+    return encode_uint256(len(value)) + padded
+
+
+_STATIC_ENCODERS = {
+    'uint256': encode_uint256,
+    'address': encode_address,
+    'bool': lambda value: encode_uint256(1 if value else 0),
+}
+
+
+def encode_args(types, values):
+    """Encode a tuple of arguments, `string` being the only dynamic type."""
+    if len(types) != len(values):
+        raise ValueError('expected {} arguments, got {}'.format(len(types), len(values)))
+    head, tail = [], []
+    tail_offset = 32 * len(types)
+    for typ, value in zip(types, values):
+        if typ == 'string':
+            head.append(encode_uint256(tail_offset))
+            chunk = encode_bytes(value.encode('utf-8'))
+            tail.append(chunk)
+            tail_offset += len(chunk)
+        else:
+            head.append(_STATIC_ENCODERS[typ](value))
+    return b''.join(head + tail)
+
+
+# selector and return type of every BetMe view function
+BETME_GETTERS = {
+    'Assertion': ('a442e629', 'string'),
+    'Deadline': ('c6f221aa', 'uint256'),
+    'ArbiterFee': ('2ba61293', 'uint256'),
+    'ArbiterPenaltyAmount': ('0ef78bea', 'uint256'),
+    'StateVersion': ('8082f85f', 'uint256'),
+    'OwnerAddress': ('7f17b05d', 'address'),
+    'ArbiterAddress': ('1471e026', 'address'),
+    'OpponentAddress': ('0f460a48', 'address'),
+    'IsArbiterAddressConfirmed': ('ea04cb8a', 'bool'),
+    'IsOpponentBetConfirmed': ('7826218c', 'bool'),
+    'ArbiterHasVoted': ('6af8a786', 'bool'),
+    'IsDecisionMade': ('5b4c7a56', 'bool'),
+    'IsAssertionTrue': ('f76c2fce', 'bool'),
+    'IsOwnerTransferMade': ('add5779e', 'bool'),
+    'IsArbiterTransferMade': ('92c8c325', 'bool'),
+    'IsOpponentTransferMade': ('2043110b', 'bool'),
+    'currentBet': ('d504cb65', 'uint256'),
+    'ArbiterFeeAmountInEther': ('3c295978', 'uint256'),
+    'ownerPayout': ('4264b4e0', 'uint256'),
+    'opponentPayout': ('3676e78d', 'uint256'),
+    'arbiterPayout': ('311a67c1', 'uint256'),
+    'getTime': ('557ed1ba', 'uint256'),
+}
+
+
+def decode_result(typ, data):
+    """Decode the return value of a single-output call."""
+    raw = bytes.fromhex(strip_0x(data))
+    if len(raw) < 32:
+        raise ValueError('short {} return data: {!r}'.format(typ, data))
+    word = int.from_bytes(raw[:32], 'big')
+    if typ == 'uint256':
+        return word
+    if typ == 'bool':
+        return word != 0
+    if typ == 'address':
+        return '0x' + raw[12:32].hex()
+    if typ == 'string':
+        length = int.from_bytes(raw[word:word + 32], 'big')
+        return raw[word + 32:word + 32 + length].decode('utf-8')
+    raise ValueError('unsupported type: {}'.format(typ))
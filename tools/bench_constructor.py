@@ -0,0 +1,62 @@
+"""Time loading and calling the smartz BetMe constructor.
+
+Loading is timed both from source and as executing the module's already
+compiled code; each call is timed on a loaded Constructor.
+Several files can be given to compare revisions, e.g. one written with
+`git show REV:smartz/betme_constructor.py`. Needs the smartz platform
+package importable.
+
+    python -m tools.bench_constructor
+    python -m tools.bench_constructor /tmp/before.py smartz/betme_constructor.py
+"""
+
+import argparse
+import sys
+import timeit
+
+FIELDS = {'assertion': 'Norman can light his Zippo', 'deadline': 1600000000}
+
+
+def bench(path, repeat=5):
+    with open(path) as f:
+        source = f.read()
+    code = compile(source, path, 'exec')
+
+    def load(code=code):
+        namespace = {'__name__': 'betme_constructor'}
+        exec(code, namespace)
+        return namespace['Constructor']
+
+    constructor = load()()
+    pooled = dict(FIELDS, pooled=True)
+    cases = [
+        ('compile and load', lambda: load(compile(source, path, 'exec')), 50),
+        ('load compiled', load, 200),
+        ('get_params', constructor.get_params, 20000),
+        ('post_construct', lambda: constructor.post_construct(FIELDS, []), 20000),
+        ('post_construct pooled', lambda: constructor.post_construct(pooled, []), 20000),
+        ('construct', lambda: constructor.construct(FIELDS), 20000),
+        ('construct pooled', lambda: constructor.construct(pooled), 20000),
+    ]
+    # best of `repeat`, in microseconds per call
+    return [(name, min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6)
+            for name, func, number in cases]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', default=['smartz/betme_constructor.py'])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = [bench(path, args.repeat) for path in args.paths]
+    print('{:<24}'.format('us per call') + ''.join('{:>14}'.format('#{}'.format(n)) for n in range(len(results))))
+    for row in zip(*results):
+        print('{:<24}'.format(row[0][0]) + ''.join('{:>14.1f}'.format(us) for _, us in row))
+    for n, path in enumerate(args.paths):
+        print('#{}: {}'.format(n, path))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
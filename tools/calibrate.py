@@ -0,0 +1,349 @@
+"""Gas model of the constructor's contracts, calibrated on a dev chain.
+
+Deploys the constructor's templates on a local dev chain, runs every
+transaction function through scripted bets, and fits
+
+    gas = base + per_byte * len(assertion) + per_slot * assertion storage slots
+
+for deployment and for setAssertionText. Every optional constructor field
+that is set adds `base + per_byte * literal bytes`, since its literal is
+compiled into the creation code. Every other function costs a fixed
+amount. Models are keyed by the sha256 of the template, so an edited
+template shows up as uncalibrated instead of being quoted with stale
+numbers. `estimate(model, fields)` quotes deploy and function gas, and
+`Constructor.estimate_gas` quotes the same from the committed table,
+smartz/betme_gas.json.
+
+The dev chain must unlock at least four accounts and support
+evm_increaseTime (ganache does both), and run the same fork rules as the
+target network, since storage gas differs between forks. Contracts are
+compiled with the `solc` binary on PATH. A held-out deployment with every
+field set is compared to the fitted model at the end.
+
+    python -m tools.calibrate --rpc http://127.0.0.1:8545 --output smartz/betme_gas.json
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from tools.abi import encode_args
+from tools.deploy import Deployer
+from tools.rpc import RpcPool
+
+
+CONSTRUCTOR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'smartz', 'betme_constructor.py')
+
+ASSERTION_SIZES = (3, 31, 32, 64, 200, 400)
+
+DAY = 86400
+
+
+def load_constructor(path):
+    spec = importlib.util.spec_from_file_location('betme_constructor', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Constructor
+
+
+def template_hash(constructor_class, pooled):
+    return hashlib.sha256(constructor_class._template(pooled).encode('utf-8')).hexdigest()
+
+
+def assertion_slots(size):
+    # short strings share the length slot, long ones keep it apart
+    return 1 if size < 32 else 1 + (size + 31) // 32
+
+
+def literal_bytes(value):
+    """Bytes pushed by the creation code for a constructor field literal."""
+    if isinstance(value, str) and value.startswith('0x'):
+        return 20
+    return max(1, (int(value).bit_length() + 7) // 8)
+
+
+def fit(points):
+    """Least squares fit of gas = base + per_byte * size + per_slot * slots."""
+    rows = [(1.0, float(size), float(assertion_slots(size)), float(gas)) for size, gas in points]
+    # normal equations, solved by Gauss-Jordan elimination
+    m = [[sum(r[i] * r[j] for r in rows) for j in range(3)] + [sum(r[i] * r[3] for r in rows)] for i in range(3)]
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda row: abs(m[row][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        for row in range(3):
+            if row != col:
+                factor = m[row][col] / m[col][col]
+                m[row] = [a - factor * b for a, b in zip(m[row], m[col])]
+    base, per_byte, per_slot = (m[i][3] / m[i][i] for i in range(3))
+    return {'base': int(round(base)), 'per_byte': int(round(per_byte)), 'per_slot': int(round(per_slot))}
+
+
+def fit_field(points):
+    """Fits extra deploy gas = base + per_byte * literal bytes from (bytes, gas) points."""
+    (bytes1, gas1), (bytes2, gas2) = points[0], points[-1]
+    if bytes1 == bytes2:
+        return {'base': gas1}
+    per_byte = (gas2 - gas1) / (bytes2 - bytes1)
+    return {'base': int(round(gas1 - per_byte * bytes1)), 'per_byte': int(round(per_byte))}
+
+
+def estimate(model, fields):
+    """Deploy gas of `construct(fields)` and gas of every transaction function."""
+    size = len(fields['assertion'].encode('utf-8'))
+    slots = assertion_slots(size)
+
+    def linear(costs):
+        return costs.get('base', 0) + costs.get('per_byte', 0) * size + costs.get('per_slot', 0) * slots
+
+    deploy_gas = linear(model['deploy'])
+    for name, costs in model['deploy_fields'].items():
+        value = fields.get(name)
+        if value:
+            deploy_gas += costs['base'] + costs.get('per_byte', 0) * literal_bytes(value)
+    return deploy_gas, {name: linear(costs) for name, costs in model['functions'].items()}
+
+
+class Compiler(object):
+
+    def __init__(self, solc='solc', optimize=False):
+        self._solc = solc
+        self._optimize = optimize
+        self.selectors = {}
+
+    def __call__(self, source, contract_name):
+        args = [self._solc, '--combined-json', 'bin,hashes']
+        if self._optimize:
+            args.append('--optimize')
+        output = json.loads(subprocess.run(args + ['-'], input=source.encode('utf-8'),
+                                           stdout=subprocess.PIPE, check=True).stdout)
+        for name, contract in output['contracts'].items():
+            if name.split(':')[-1] == contract_name:
+                for signature, selector in contract['hashes'].items():
+                    fn, types = re.match(r'(\w+)\((.*)\)', signature).groups()
+                    self.selectors[fn] = (selector, tuple(filter(None, types.split(','))))
+                return contract['bin']
+        raise KeyError('{} not found in solc output'.format(contract_name))
+
+
+class Session(object):
+    """Sends transactions from the dev chain's unlocked accounts."""
+
+    def __init__(self, rpc, compiler):
+        self.rpc = rpc
+        self.compiler = compiler
+
+    def data(self, fn, *args):
+        selector, types = self.compiler.selectors[fn]
+        return '0x' + selector + encode_args(types, args).hex()
+
+    def view(self, address, fn):
+        return int(self.rpc.call('eth_call', {'to': address, 'data': self.data(fn)}, 'latest'), 16)
+
+    def now(self):
+        return int(self.rpc.call('eth_getBlockByNumber', 'latest', False)['timestamp'], 16)
+
+    def advance(self, seconds):
+        self.rpc.call('evm_increaseTime', seconds)
+        self.rpc.call('evm_mine')
+
+    def transact(self, sender, address, fn, *args, value=0):
+        tx_hash = self.rpc.call('eth_sendTransaction', {
+            'from': sender, 'to': address, 'data': self.data(fn, *args),
+            'value': hex(value), 'gas': hex(3000000),
+        })
+        while True:
+            receipt = self.rpc.call('eth_getTransactionReceipt', tx_hash)
+            if receipt:
+                break
+            time.sleep(0.1)
+        if receipt.get('status', '0x1') != '0x1':
+            raise RuntimeError('{} reverted'.format(fn))
+        return int(receipt['gasUsed'], 16)
+
+
+def deploy(deployer, items):
+    deployments = deployer.deploy(items).deployments
+    for deployment in deployments:
+        if not deployment.success:
+            raise RuntimeError('deployment {} failed'.format(deployment.tx_hash))
+    return deployments
+
+
+def field_variants(session, accounts, pooled):
+    """(field name, [(fields, baseline fields)]) with values of different literal sizes."""
+    _, arbiter, opponent, _ = accounts[:4]
+    now = session.now()
+    far_deadline = 2 ** 72
+    variants = [
+        ('arbiterAddr', [({'arbiterAddr': arbiter}, {})]),
+        ('feePercent', [({'feePercent': 5}, {}), ({'feePercent': 99 * 10 ** 18}, {})]),
+        ('arbiterPenaltyAmount', [({'arbiterPenaltyAmount': 1000}, {}), ({'arbiterPenaltyAmount': 10 ** 30}, {})]),
+        ('deadline', [({'deadline': now + 30 * DAY}, {}), ({'deadline': far_deadline}, {})]),
+    ]
+    if pooled:
+        variants.append(('bettingDeadline', [
+            ({'deadline': far_deadline, 'bettingDeadline': now + DAY}, {'deadline': far_deadline}),
+            ({'deadline': far_deadline, 'bettingDeadline': 2 ** 64}, {'deadline': far_deadline}),
+        ]))
+    else:
+        variants.append(('opponentAddr', [({'opponentAddr': opponent}, {})]))
+    return variants
+
+
+def calibrate_mode(constructor, session, deployer, accounts, pooled):
+    owner, arbiter, opponent, bettor = accounts[:4]
+
+    def construct(fields):
+        return constructor.construct(dict(fields, assertion=fields.get('assertion', 'abc'), pooled=pooled))
+
+    sized = deploy(deployer, [construct({'assertion': 'a' * size}) for size in ASSERTION_SIZES])
+    deploy_model = fit([(size, deployment.gas_used) for size, deployment in zip(ASSERTION_SIZES, sized)])
+    functions = {'setAssertionText': fit([
+        (size, session.transact(owner, deployment.contract_address, 'setAssertionText', 'b' * size))
+        for size, deployment in zip(ASSERTION_SIZES, sized)
+    ])}
+
+    deploy_fields = {}
+    for name, pairs in field_variants(session, accounts, pooled):
+        points = []
+        for fields, baseline in pairs:
+            with_field, without_field = deploy(deployer, [construct(fields), construct(baseline)])
+            points.append((literal_bytes(fields[name]), with_field.gas_used - without_field.gas_used))
+        deploy_fields[name] = fit_field(points)
+
+    def run(steps):
+        address = deploy(deployer, [construct({})])[0].contract_address
+        for label, sender, fn, args, value in steps:
+            if fn == 'advance':
+                session.advance(*args)
+                continue
+            if fn in ('agreeToBecameArbiter', 'betAssertIsTrue', 'betAssertIsFalse'):
+                args = (session.view(address, 'StateVersion'),)
+            used = session.transact(sender, address, fn, *args, value=value)
+            if label and label not in functions:
+                functions[label] = {'base': used}
+
+    def setup():
+        now = session.now()
+        steps = [
+            ('setDeadline', owner, 'setDeadline', (now + 10 * DAY,), 0),
+            ('setArbiterFee', owner, 'setArbiterFee', (10 ** 18,), 0),
+            ('setArbiterPenaltyAmount', owner, 'setArbiterPenaltyAmount', (1000,), 0),
+            ('setArbiterAddress', owner, 'setArbiterAddress', (arbiter,), 0),
+        ]
+        if pooled:
+            steps.append(('setBettingDeadline', owner, 'setBettingDeadline', (now + DAY,), 0))
+        return steps
+
+    if pooled:
+        matched = [
+            ('agreeToBecameArbiter', arbiter, 'agreeToBecameArbiter', (), 1000),
+            ('betAssertIsTrue', owner, 'betAssertIsTrue', (), 10 ** 15),
+            ('betAssertIsFalse', bettor, 'betAssertIsFalse', (), 10 ** 15),
+            # voting opens once betting is closed
+            (None, None, 'advance', (2 * DAY,), 0),
+        ]
+        run(setup() + matched + [
+            ('agreeAssertionTrue', arbiter, 'agreeAssertionTrue', (), 0),
+            ('withdraw', owner, 'withdraw', (), 0),
+            (None, arbiter, 'withdraw', (), 0),
+            ('deleteContract', owner, 'deleteContract', (), 0),
+        ])
+        run(setup() + [
+            (None, arbiter, 'agreeToBecameArbiter', (), 1000),
+            ('arbiterSelfRetreat', arbiter, 'arbiterSelfRetreat', (), 0),
+        ] + matched + [
+            ('agreeAssertionFalse', arbiter, 'agreeAssertionFalse', (), 0),
+        ])
+        run(setup() + matched + [
+            ('agreeAssertionUnresolvable', arbiter, 'agreeAssertionUnresolvable', (), 0),
+        ])
+    else:
+        opposed = [
+            ('setOpponentAddress', owner, 'setOpponentAddress', (opponent,), 0),
+            ('bet', owner, 'bet', (), 10 ** 15),
+            ('agreeToBecameArbiter', arbiter, 'agreeToBecameArbiter', (), 1000),
+            ('betAssertIsFalse', opponent, 'betAssertIsFalse', (), 10 ** 15),
+        ]
+        run(setup() + opposed + [
+            ('agreeAssertionTrue', arbiter, 'agreeAssertionTrue', (), 0),
+            ('settle', owner, 'settle', (), 0),
+        ])
+        run(setup() + opposed + [
+            ('agreeAssertionFalse', arbiter, 'agreeAssertionFalse', (), 0),
+            ('withdraw', opponent, 'withdraw', (), 0),
+            (None, arbiter, 'withdraw', (), 0),
+            ('deleteContract', owner, 'deleteContract', (), 0),
+        ])
+        run(setup() + opposed[:3] + [
+            ('arbiterSelfRetreat', arbiter, 'arbiterSelfRetreat', (), 0),
+            (None, arbiter, 'agreeToBecameArbiter', (), 1000),
+            (None, opponent, 'betAssertIsFalse', (), 10 ** 15),
+            ('agreeAssertionUnresolvable', arbiter, 'agreeAssertionUnresolvable', (), 0),
+        ])
+
+    return {'deploy': deploy_model, 'deploy_fields': deploy_fields, 'functions': functions}
+
+
+def check_mode(constructor, session, deployer, accounts, pooled, model):
+    """Measured and estimated deploy gas of a variant which was not fitted."""
+    now = session.now()
+    fields = {
+        'assertion': 'c' * 100, 'pooled': pooled, 'deadline': now + 20 * DAY,
+        'arbiterAddr': accounts[1], 'feePercent': 3 * 10 ** 18, 'arbiterPenaltyAmount': 10 ** 16,
+    }
+    if pooled:
+        fields['bettingDeadline'] = now + 10 * DAY
+    else:
+        fields['opponentAddr'] = accounts[2]
+    measured = deploy(deployer, [constructor.construct(fields)])[0].gas_used
+    return measured, estimate(model, fields)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rpc', default='http://127.0.0.1:8545')
+    parser.add_argument('--solc', default='solc')
+    parser.add_argument('--optimize', action='store_true', help='compile with the solc optimizer')
+    parser.add_argument('--constructor', default=CONSTRUCTOR_PATH)
+    parser.add_argument('--output', help='JSON file to merge the models into, printed when omitted')
+    args = parser.parse_args(argv)
+
+    constructor_class = load_constructor(args.constructor)
+    constructor = constructor_class()
+    session = Session(RpcPool(args.rpc), Compiler(args.solc, args.optimize))
+    accounts = session.rpc.call('eth_accounts')
+    if len(accounts) < 4:
+        parser.error('the node must unlock at least four accounts')
+
+    table = {}
+    with Deployer(session.rpc, accounts[0], compile=session.compiler, poll_interval=0.1) as deployer:
+        for pooled in (False, True):
+            model = calibrate_mode(constructor, session, deployer, accounts, pooled)
+            measured, estimated = check_mode(constructor, session, deployer, accounts, pooled, model)
+            print('{} template: held-out deploy measured {}, estimated {} ({:+.2%})'.format(
+                'pooled' if pooled else 'single opponent', measured, estimated,
+                (estimated - measured) / measured), file=sys.stderr)
+            table[template_hash(constructor_class, pooled)] = model
+
+    if args.output:
+        if os.path.exists(args.output):
+            with open(args.output, encoding='utf-8') as f:
+                table = dict(json.load(f), **table)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(table, f, indent=4, sort_keys=True)
+            f.write('\n')
+    else:
+        print(json.dumps(table, indent=4, sort_keys=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""Bulk deployment of BetMe contracts from a single account.
+
+Deployment transactions are signed up front with locally assigned nonces and
+gas limits, pushed to the node in JSON-RPC batches and tracked with a bounded
+number of transactions in flight. A transaction that stays unmined for too
+long while holding the lowest pending nonce is replaced by the same
+transaction with a higher gas price, together with the pending transactions
+behind it that were priced the same; the not yet sent ones are re-signed at
+the new price.
+
+    python -m tools.deploy --devchain --count 1000
+    python -m tools.deploy --rpc http://127.0.0.1:8545 --from 0x... \\
+        --bytecode build/BetMe.bin params.jsonl
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import hashlib
+import json
+import sys
+import time
+
+from tools.abi import BETME_CONSTRUCTOR_TYPES, ZERO_ADDR, encode_args, strip_0x
+from tools.rpc import RpcError, RpcPool
+
+
+# Constructor arguments of BetMe, in contract units: `fee_percent` is a
+# percent with 18 decimals, amounts are in wei.
+BetParams = collections.namedtuple('BetParams', [
+    'assertion', 'deadline', 'fee_percent', 'arbiter_addr', 'opponent_addr', 'arbiter_penalty_amount',
+])
+BetParams.__new__.__defaults__ = (0, ZERO_ADDR, ZERO_ADDR, 0)
+
+Deployment = collections.namedtuple('Deployment', [
+    'index', 'nonce', 'tx_hash', 'contract_address', 'gas_used', 'success', 'replacements',
+])
+
+
+class DeployReport(collections.namedtuple('DeployReport', ['deployments', 'elapsed'])):
+
+    @property
+    def per_second(self):
+        return len(self.deployments) / self.elapsed if self.elapsed else float('inf')
+
+
+class DeploymentError(Exception):
+    pass
+
+
+_Pending = collections.namedtuple('_Pending', ['tx', 'hashes', 'sent_at'])
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class NodeSigner(object):
+    """Signs with an account unlocked on the node, e.g. a dev chain."""
+
+    def __init__(self, rpc, batch_size=100):
+        self._rpc = rpc
+        self._batch_size = batch_size
+
+    def sign(self, txs):
+        raws = []
+        for chunk in _chunks(txs, self._batch_size):
+            for result in self._rpc.batch([('eth_signTransaction', (tx,)) for tx in chunk]):
+                if isinstance(result, RpcError):
+                    raise result
+                # geth returns {"raw": ..., "tx": ...}, ganache the raw hex string
+                raws.append(result['raw'] if isinstance(result, dict) else result)
+        return raws
+
+
+class LocalSigner(object):
+    """Signs in-process with a private key; needs the `eth_account` package."""
+
+    def __init__(self, private_key, chain_id):
+        from eth_account import Account
+        self._account = Account.from_key(private_key)
+        self._chain_id = chain_id
+        self.address = self._account.address
+
+    def sign(self, txs):
+        raws = []
+        for tx in txs:
+            signed = self._account.sign_transaction({
+                'nonce': int(tx['nonce'], 16),
+                'gas': int(tx['gas'], 16),
+                'gasPrice': int(tx['gasPrice'], 16),
+                'value': 0,
+                'data': tx['data'],
+                'chainId': self._chain_id,
+            })
+            raw = getattr(signed, 'raw_transaction', None) or signed.rawTransaction
+            raws.append('0x' + strip_0x(raw.hex()))
+        return raws
+
+
+class Deployer(object):
+    """Deploys many contracts from `sender`.
+
+    Items are `BetParams` (deployed with `bytecode`, the compiled BetMe
+    creation code) or `Constructor.construct()` results (compiled with
+    `compile(source, contract_name) -> bytecode`, once per distinct source).
+    """
+
+    # geth and parity reject a same-nonce replacement priced less than 10% higher
+    REPLACEMENT_BUMP_DIVISOR = 8
+
+    def __init__(self, rpc, sender, signer=None, bytecode=None, compile=None,
+                 gas_limit=None, gas_price=None, batch_size=50, max_pending=64,
+                 replace_after=60.0, poll_interval=0.5,
+                 clock=time.monotonic, sleep=time.sleep):
+        signer_address = getattr(signer, 'address', None)
+        if signer_address is not None and signer_address.lower() != sender.lower():
+            raise ValueError('signer key is for {}, not for sender {}'.format(signer_address, sender))
+        self._rpc = rpc
+        self.sender = sender
+        self._signer = signer or NodeSigner(rpc, batch_size)
+        self._bytecode = strip_0x(bytecode) if bytecode else None
+        self._compile = compile
+        self._compiled = {}
+        self._gas_limit = gas_limit
+        self._gas_price = gas_price
+        self._batch_size = batch_size
+        self._max_pending = max_pending
+        self._replace_after = replace_after
+        self._poll_interval = poll_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=getattr(rpc, 'size', 1))
+
+    def deploy(self, items):
+        started = self._clock()
+        datas = ['0x' + self._payload(item) for item in items]
+        gas_price = self._gas_price or int(self._rpc.call('eth_gasPrice'), 16)
+        gas_limits = self._gas_limits(datas)
+        first_nonce = int(self._rpc.call('eth_getTransactionCount', self.sender, 'pending'), 16)
+        txs = [
+            self._tx(first_nonce + index, data, gas, gas_price)
+            for index, (data, gas) in enumerate(zip(datas, gas_limits))
+        ]
+        raws = self._signer.sign(txs)
+
+        queued = collections.deque(range(len(txs)))
+        pending = {}
+        done = {}
+        while queued or pending:
+            window = []
+            while queued and len(pending) + len(window) < self._max_pending:
+                window.append(queued.popleft())
+            self._send(window, txs, raws, pending)
+            mined = self._poll(pending, done)
+            self._replace_stuck(pending, queued, txs, raws)
+            if pending and not mined:
+                self._sleep(self._poll_interval)
+
+        deployments = [done[index] for index in range(len(txs))]
+        return DeployReport(deployments, self._clock() - started)
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _payload(self, item):
+        if isinstance(item, BetParams):
+            if self._bytecode is None:
+                raise ValueError('deploying BetParams requires BetMe bytecode')
+            return self._bytecode + encode_args(BETME_CONSTRUCTOR_TYPES, item).hex()
+        if item.get('result') != 'success':
+            raise ValueError('construct() did not succeed: {!r}'.format(item))
+        if self._compile is None:
+            raise ValueError('deploying construct() output requires a compile function')
+        key = hashlib.sha256(item['source'].encode('utf-8')).hexdigest()
+        if key not in self._compiled:
+            self._compiled[key] = strip_0x(self._compile(item['source'], item['contract_name']))
+        return self._compiled[key]
+
+    def _gas_limits(self, datas):
+        if self._gas_limit:
+            return [self._gas_limit] * len(datas)
+        distinct = sorted(set(datas))
+        estimates = {}
+        for chunk in _chunks(distinct, self._batch_size):
+            calls = [('eth_estimateGas', ({'from': self.sender, 'data': data},)) for data in chunk]
+            for data, result in zip(chunk, self._rpc.batch(calls)):
+                if isinstance(result, RpcError):
+                    raise DeploymentError('gas estimation failed: {}'.format(result))
+                # estimates are taken against the latest block, leave some headroom
+                estimates[data] = int(result, 16) * 6 // 5
+        return [estimates[data] for data in datas]
+
+    def _tx(self, nonce, data, gas, gas_price):
+        return {
+            'from': self.sender,
+            'nonce': hex(nonce),
+            'gas': hex(gas),
+            'gasPrice': hex(gas_price),
+            'value': '0x0',
+            'data': data,
+        }
+
+    def _send(self, indexes, txs, raws, pending):
+        for chunk in _chunks(indexes, self._batch_size):
+            results = self._rpc.batch([('eth_sendRawTransaction', (raws[index],)) for index in chunk])
+            now = self._clock()
+            for index, result in zip(chunk, results):
+                if isinstance(result, RpcError):
+                    raise DeploymentError('transaction {} (nonce {}) rejected: {}'.format(
+                        index, int(txs[index]['nonce'], 16), result))
+                pending[index] = _Pending(txs[index], [result], now)
+
+    def _fetch_receipts(self, lookups):
+        return self._rpc.batch([('eth_getTransactionReceipt', (tx_hash,)) for _, tx_hash in lookups])
+
+    def _poll(self, pending, done):
+        lookups = [(index, tx_hash) for index, item in pending.items() for tx_hash in item.hashes]
+        chunks = list(_chunks(lookups, self._batch_size))
+        mined = 0
+        for chunk, receipts in zip(chunks, self._executor.map(self._fetch_receipts, chunks)):
+            for (index, tx_hash), receipt in zip(chunk, receipts):
+                if not receipt or isinstance(receipt, RpcError) or index not in pending:
+                    continue
+                item = pending.pop(index)
+                done[index] = Deployment(
+                    index=index,
+                    nonce=int(item.tx['nonce'], 16),
+                    tx_hash=tx_hash,
+                    contract_address=receipt.get('contractAddress'),
+                    gas_used=int(receipt['gasUsed'], 16),
+                    success=receipt.get('status', '0x1') == '0x1',
+                    replacements=len(item.hashes) - 1,
+                )
+                mined += 1
+        return mined
+
+    def _replace_stuck(self, pending, queued, txs, raws):
+        # Only the lowest pending nonce can hold the account back; later ones
+        # are waiting behind it. Those sent at the same price are just as
+        # underpriced, so they are repriced along with it rather than each
+        # waiting out its own replace_after once it becomes the lowest. The
+        # queued transactions still carry that price too and are re-signed
+        # before they are ever sent, or every later window would stick again.
+        if not pending:
+            return
+        lowest = min(pending, key=lambda i: int(pending[i].tx['nonce'], 16))
+        if self._clock() - pending[lowest].sent_at < self._replace_after:
+            return
+        stale_price = pending[lowest].tx['gasPrice']
+        indexes = sorted(
+            (index for index, item in pending.items() if item.tx['gasPrice'] == stale_price),
+            key=lambda i: int(pending[i].tx['nonce'], 16),
+        )
+        unsent = [index for index in queued if txs[index]['gasPrice'] == stale_price]
+        price = int(stale_price, 16)
+        bumped = hex(price + price // self.REPLACEMENT_BUMP_DIVISOR + 1)
+        replacements = [dict(pending[index].tx, gasPrice=bumped) for index in indexes]
+        resigned = [dict(txs[index], gasPrice=bumped) for index in unsent]
+        signed = self._signer.sign(replacements + resigned)
+        for index, tx, raw in zip(unsent, resigned, signed[len(replacements):]):
+            txs[index] = tx
+            raws[index] = raw
+        for chunk in _chunks(list(zip(indexes, replacements, signed)), self._batch_size):
+            results = self._rpc.batch([('eth_sendRawTransaction', (raw,)) for _, _, raw in chunk])
+            now = self._clock()
+            for (index, tx, _), result in zip(chunk, results):
+                item = pending[index]
+                if isinstance(result, RpcError):
+                    # the original may have been mined meanwhile; the next poll tells
+                    pending[index] = item._replace(sent_at=now)
+                else:
+                    pending[index] = _Pending(tx, item.hashes + [result], now)
+
+
+def _read_params(path):
+    with open(path) as f:
+        return [BetParams(**json.loads(line)) for line in f if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--rpc', help='JSON-RPC endpoint URL')
+    target.add_argument('--devchain', action='store_true', help='use the in-process dev chain stand-in')
+    parser.add_argument('--from', dest='sender', help='deploying account, unlocked on the node')
+    parser.add_argument('--bytecode', help='file with compiled BetMe creation bytecode (hex)')
+    parser.add_argument('--count', type=int, default=100, help='synthetic bets to deploy when no params file is given')
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--replace-after', type=float, default=60.0)
+    parser.add_argument('params', nargs='?', help='JSON lines file with BetParams fields')
+    args = parser.parse_args(argv)
+
+    if args.devchain:
+        from tools.devchain import DevChain
+        rpc = DevChain()
+        sender = args.sender or rpc.accounts[0]
+        bytecode = '00'
+    else:
+        if not args.sender or not args.bytecode:
+            parser.error('--rpc requires --from and --bytecode')
+        rpc = RpcPool(args.rpc, size=args.pool_size)
+        sender = args.sender
+        with open(args.bytecode) as f:
+            bytecode = f.read().strip()
+
+    if args.params:
+        items = _read_params(args.params)
+    else:
+        deadline = int(time.time()) + 86400 * 7
+        items = [BetParams('Synthetic bet #{}'.format(n), deadline) for n in range(args.count)]
+
+    with Deployer(rpc, sender, bytecode=bytecode, batch_size=args.batch_size,
+                  max_pending=args.max_pending, replace_after=args.replace_after) as deployer:
+        report = deployer.deploy(items)
+    failed = sum(1 for deployment in report.deployments if not deployment.success)
+    replaced = sum(1 for deployment in report.deployments if deployment.replacements)
+    print('{} deployments in {:.2f}s: {:.1f} deployments/s, {} failed, {} replaced'.format(
+        len(report.deployments), report.elapsed, report.per_second, failed, replaced))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Read-through cache for BetMe view calls.
+
+A BetMe getter can only change its result when the contract state changes:
+the owner's setters bump `StateVersion`, and every other transition either
+flips one of the flags or makes the owner bet (`currentBet`). The cache
+therefore keys results by contract, state key and getter, and probes the
+state key at most once per block, reading the three storage slots it lives
+in rather than calling its ten getters. The payout getters also
+change once `getTime()` passes `Deadline`, so their entries expire exactly
+at `Deadline + 1` in chain time.
+
+    cache = BetMeReadCache(RpcPool('http://127.0.0.1:8545'))
+    values = cache.read(address, ['Assertion', 'Deadline', 'ownerPayout'])
+"""
+
+import collections
+
+from tools.abi import BETME_GETTERS, decode_result
+from tools.rpc import RpcError
+
+
+# getters forming the state key; results of all getters are a function of it
+STATE_GETTERS = (
+    'StateVersion',
+    'currentBet',
+    'IsArbiterAddressConfirmed',
+    'IsOpponentBetConfirmed',
+    'ArbiterHasVoted',
+    'IsDecisionMade',
+    'IsAssertionTrue',
+    'IsOwnerTransferMade',
+    'IsArbiterTransferMade',
+    'IsOpponentTransferMade',
+)
+
+# Storage slots holding the state key, from the declaration order in
+# contracts/BetMe.sol: StateVersion, betAmount (returned by currentBet()) and
+# OpponentAddress, with the eight flags packed above it in declaration order.
+STATE_VERSION_SLOT = 4
+BET_AMOUNT_SLOT = 5
+FLAGS_SLOT = 8
+_FLAGS_OFFSET = 20
+
+# results that may also change when getTime() passes Deadline
+DEADLINE_DEPENDENT = frozenset(['ownerPayout', 'opponentPayout', 'arbiterPayout'])
+
+# never cached: changes every block
+UNCACHED = frozenset(['getTime'])
+
+
+class LRUCache(object):
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class BetMeReadCache(object):
+
+    def __init__(self, rpc, maxsize=4096):
+        self._rpc = rpc
+        self._results = LRUCache(maxsize)
+        self._state_keys = LRUCache(maxsize)
+        self.calls = 0
+        self.hits = 0
+
+    def call(self, address, name):
+        return self.read(address, [name])[name]
+
+    def read(self, address, names):
+        return self.read_many([address], names)[address]
+
+    def read_many(self, addresses, names):
+        """Return `{address: {getter: value}}`, fetching only what is stale."""
+        for name in names:
+            if name not in BETME_GETTERS:
+                raise KeyError('unknown BetMe getter: {}'.format(name))
+        block, now = self._refresh_head()
+        state_keys = self._probe_state(addresses, block)
+
+        values = {address: {} for address in addresses}
+        misses = []
+        for address in addresses:
+            key = state_keys[address]
+            wanted = list(names)
+            if DEADLINE_DEPENDENT.intersection(names) and 'Deadline' not in wanted:
+                # payout entries are dated by Deadline, keep it at hand
+                wanted.append('Deadline')
+            for name in wanted:
+                if name in STATE_GETTERS:
+                    values[address][name] = key[STATE_GETTERS.index(name)]
+                    continue
+                entry = None if name in UNCACHED else self._results.get((address, key, name))
+                if entry is not None and (entry[1] is None or now < entry[1]):
+                    values[address][name] = entry[0]
+                    self.hits += 1
+                else:
+                    misses.append((address, name))
+
+        fetched = self._eth_call(misses, block)
+        for (address, name), value in zip(misses, fetched):
+            values[address][name] = value
+        for (address, name), value in zip(misses, fetched):
+            if name in UNCACHED:
+                continue
+            expires = None
+            deadline = values[address]['Deadline'] if name in DEADLINE_DEPENDENT else None
+            if deadline is not None and now <= deadline:
+                expires = deadline + 1
+            self._results.put((address, state_keys[address], name), (value, expires))
+
+        return {address: {name: got[name] for name in names} for address, got in values.items()}
+
+    def _refresh_head(self):
+        head = self._rpc.call('eth_getBlockByNumber', 'latest', False)
+        return int(head['number'], 16), int(head['timestamp'], 16)
+
+    def _probe_state(self, addresses, block):
+        state_keys = {}
+        stale = []
+        for address in addresses:
+            probed = self._state_keys.get(address)
+            if probed is not None and probed[0] == block:
+                state_keys[address] = probed[1]
+            else:
+                stale.append(address)
+        if not stale:
+            return state_keys
+        slots = (STATE_VERSION_SLOT, BET_AMOUNT_SLOT, FLAGS_SLOT)
+        tag = hex(block)
+        results = iter(self._rpc.batch([
+            ('eth_getStorageAt', (address, hex(slot), tag)) for address in stale for slot in slots
+        ]))
+        self.calls += len(stale) * len(slots)
+        for address in stale:
+            state_version, bet_amount, flags = (_storage_word(next(results)) for _ in slots)
+            # packed values sit from the low-order end of the word up, a bool per byte
+            key = (state_version, bet_amount) + tuple(
+                (flags >> 8 * (_FLAGS_OFFSET + n)) & 0xff != 0 for n in range(len(STATE_GETTERS) - 2))
+            self._state_keys.put(address, (block, key))
+            state_keys[address] = key
+        return state_keys
+
+    def _eth_call(self, lookups, block):
+        if not lookups:
+            return []
+        tag = hex(block)
+        results = self._rpc.batch([
+            ('eth_call', ({'to': address, 'data': '0x' + BETME_GETTERS[name][0]}, tag))
+            for address, name in lookups
+        ])
+        self.calls += len(lookups)
+        values = []
+        for (address, name), result in zip(lookups, results):
+            if isinstance(result, RpcError):
+                raise result
+            if result in (None, '0x'):
+                raise LookupError('no BetMe contract at {}'.format(address))
+            values.append(decode_result(BETME_GETTERS[name][1], result))
+        return values
+
+
+def _storage_word(result):
+    if isinstance(result, RpcError):
+        raise result
+    return int(result, 16)
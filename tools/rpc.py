@@ -0,0 +1,99 @@
+"""Pooled, pipelined JSON-RPC client.
+
+Calls are grouped into JSON-RPC batches, so one HTTP round trip carries many
+requests, and several batches may be in flight at once over a pool of
+persistent keep-alive connections.
+"""
+
+import http.client
+import itertools
+import json
+import queue
+import threading
+from urllib.parse import urlsplit
+
+
+class RpcError(Exception):
+
+    def __init__(self, error):
+        super().__init__(error.get('message', 'JSON-RPC error'))
+        self.code = error.get('code')
+        self.data = error.get('data')
+
+
+class RpcPool(object):
+
+    def __init__(self, url, size=4, timeout=30):
+        parts = urlsplit(url)
+        self._conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._path = parts.path or '/'
+        self._timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._ids = itertools.count(1)
+        self._ids_lock = threading.Lock()
+        self.size = size
+
+    def call(self, method, *params):
+        result = self.batch([(method, params)])[0]
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    def batch(self, calls):
+        """Send `(method, params)` pairs in one request.
+
+        Returns results in call order; failed calls are returned as
+        `RpcError` instances instead of raising, so one bad transaction
+        does not hide the outcome of the rest of the batch.
+        """
+        if not calls:
+            return []
+        with self._ids_lock:
+            ids = [next(self._ids) for _ in calls]
+        payload = [
+            {'jsonrpc': '2.0', 'id': id_, 'method': method, 'params': list(params)}
+            for id_, (method, params) in zip(ids, calls)
+        ]
+        responses = self._post(payload)
+        if isinstance(responses, dict):
+            # some nodes answer a malformed batch with a single error object
+            raise RpcError(responses.get('error') or {'message': 'unexpected response'})
+        by_id = {response.get('id'): response for response in responses}
+        results = []
+        for id_ in ids:
+            response = by_id.get(id_, {'error': {'message': 'no response for request {}'.format(id_)}})
+            if 'error' in response:
+                results.append(RpcError(response['error']))
+            else:
+                results.append(response.get('result'))
+        return results
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _post(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive'}
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._conn_class(self._netloc, timeout=self._timeout)
+            try:
+                conn.request('POST', self._path, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                raise
+            if response.status != 200:
+                conn.close()
+                raise RpcError({'code': response.status, 'message': data.decode('utf-8', 'replace')})
+            self._idle.put(conn)
+        return json.loads(data.decode('utf-8'))
@@ -0,0 +1,341 @@
+"""Columnar, append-only store of BetMe state snapshots.
+
+Every column lives in its own file of fixed-width little-endian values:
+uint64 for timestamps and state versions, uint256 for deadlines and ether
+amounts (the contract accepts any uint256), 20 raw bytes for addresses, one
+bitmask byte for the flags, and a uint32 code for the assertion text, whose
+distinct values are kept in a dictionary file. Rows are appended to every
+column, the flags column last, so its length is the committed row count.
+The column and flag bit layout is recorded in the store and checked on
+open. Only single-opponent BetMe contracts are stored; pooled ones are
+rejected.
+
+Readers map the files read-only and hand out zero-copy `memoryview`s of
+the columns. Only flag predicates, e.g. "arbiter voted but owner not paid
+yet", are vectorised: the flags column is streamed in blocks through one
+`bytes.translate` pass, so memory stays bounded by the block size rather
+than the row count. Predicates on the other columns, such as "deadline
+passed", are a `where` callable run in Python on each row the flags
+matched, so keep the flags selective on large stores:
+
+    reader = SnapshotReader('snapshots/')
+    rows = reader.scan(raised=['ArbiterHasVoted'], cleared=['IsOwnerTransferMade'])
+    late = reader.scan(cleared=['IsOwnerTransferMade'], where=lambda r, i: r.value('Deadline', i) < now)
+
+    python -m tools.snapshots bench --rows 10000000
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+
+from tools.abi import ZERO_ADDR, strip_0x
+
+
+# bit positions are part of the on-disk format: append, never reorder
+FLAGS = (
+    'IsArbiterAddressConfirmed',
+    'IsOpponentBetConfirmed',
+    'ArbiterHasVoted',
+    'IsDecisionMade',
+    'IsAssertionTrue',
+    'IsOwnerTransferMade',
+    'IsArbiterTransferMade',
+    'IsOpponentTransferMade',
+)
+FLAG_BITS = {name: 1 << bit for bit, name in enumerate(FLAGS)}
+
+# (column name, kind, width in bytes)
+COLUMNS = (
+    ('timestamp', 'uint64', 8),
+    ('contract', 'address', 20),
+    ('StateVersion', 'uint64', 8),
+    ('Deadline', 'uint256', 32),
+    ('currentBet', 'uint256', 32),
+    ('ArbiterFee', 'uint256', 32),
+    ('ArbiterPenaltyAmount', 'uint256', 32),
+    ('ArbiterFeeAmountInEther', 'uint256', 32),
+    ('ownerPayout', 'uint256', 32),
+    ('opponentPayout', 'uint256', 32),
+    ('arbiterPayout', 'uint256', 32),
+    ('OwnerAddress', 'address', 20),
+    ('ArbiterAddress', 'address', 20),
+    ('OpponentAddress', 'address', 20),
+    ('Assertion', 'dict', 4),
+    # written last: its length is the number of committed rows
+    ('flags', 'flags', 1),
+)
+
+_WIDTHS = {name: width for name, _, width in COLUMNS}
+_KINDS = {name: kind for name, kind, _ in COLUMNS}
+_DICTIONARY = 'Assertion.dict'
+_LAYOUT = 'layout.json'
+# getters only pooled contracts have
+_POOLED_GETTERS = ('TotalTrue', 'TotalFalse')
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+# flags bytes translated per pass when matching flag predicates
+_SCAN_BLOCK = 1 << 20
+
+
+def _column_path(path, name):
+    return os.path.join(path, name + '.col')
+
+
+def _encode(kind, width, value):
+    if kind == 'address':
+        raw = bytes.fromhex(strip_0x(value or ZERO_ADDR))
+        if len(raw) != width:
+            raise ValueError('bad address: {!r}'.format(value))
+        return raw
+    value = int(value or 0)
+    if not 0 <= value < 1 << (8 * width):
+        raise ValueError('{} does not fit a {}-byte column'.format(value, width))
+    return value.to_bytes(width, 'little')
+
+
+def _decode(kind, raw):
+    if kind == 'address':
+        return '0x' + raw.hex()
+    return int.from_bytes(raw, 'little')
+
+
+def flags_of(values):
+    return sum(bit for name, bit in FLAG_BITS.items() if values.get(name))
+
+
+def _layout():
+    return {'columns': [list(column) for column in COLUMNS], 'flags': list(FLAGS)}
+
+
+def _check_layout(path):
+    with open(os.path.join(path, _LAYOUT), encoding='utf-8') as f:
+        if json.load(f) != _layout():
+            raise ValueError('{} was written with another column or flag layout'.format(path))
+
+
+class SnapshotWriter(object):
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        rows = self._committed_rows()
+        if os.path.exists(os.path.join(path, _LAYOUT)):
+            _check_layout(path)
+        elif rows:
+            raise ValueError('{} has rows but no {}'.format(path, _LAYOUT))
+        else:
+            with open(os.path.join(path, _LAYOUT), 'w', encoding='utf-8') as f:
+                json.dump(_layout(), f)
+        self._files = {}
+        for name, _, width in COLUMNS:
+            f = open(_column_path(path, name), 'ab')
+            # drop values of a row which was not committed before a crash
+            f.truncate(rows * width)
+            self._files[name] = f
+        self._codes = {}
+        dictionary = os.path.join(path, _DICTIONARY)
+        if os.path.exists(dictionary):
+            with open(dictionary, encoding='utf-8') as f:
+                for code, line in enumerate(f):
+                    self._codes[json.loads(line)] = code
+        self._dictionary = open(dictionary, 'a', encoding='utf-8')
+        self.rows = rows
+
+    def _committed_rows(self):
+        try:
+            return os.path.getsize(_column_path(self.path, 'flags'))
+        except OSError:
+            return 0
+
+    def append(self, contract, timestamp, values):
+        """Append one snapshot; `values` maps BetMe getter names to results."""
+        self.append_many([(contract, timestamp, values)])
+
+    def append_many(self, snapshots):
+        chunks = {name: bytearray() for name in _WIDTHS}
+        for contract, timestamp, values in snapshots:
+            if any(name in values for name in _POOLED_GETTERS):
+                raise ValueError('{} is a pooled contract, which snapshots do not store'.format(contract))
+            row = dict(values, contract=contract, timestamp=timestamp)
+            for name, kind, width in COLUMNS:
+                if kind == 'flags':
+                    chunks[name].append(flags_of(values))
+                elif kind == 'dict':
+                    chunks[name] += self._code(row.get(name) or '').to_bytes(4, 'little')
+                else:
+                    chunks[name] += _encode(kind, width, row.get(name))
+        self._dictionary.flush()
+        self._write(chunks, len(snapshots))
+
+    def _code(self, text):
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self._codes)
+            self._dictionary.write(json.dumps(text) + '\n')
+        return code
+
+    def _write(self, chunks, count):
+        for name, _, _ in COLUMNS:
+            f = self._files[name]
+            f.write(chunks[name])
+            f.flush()
+        self.rows += count
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._dictionary.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SnapshotReader(object):
+
+    def __init__(self, path):
+        self.path = path
+        _check_layout(path)
+        self.rows = os.path.getsize(_column_path(path, 'flags'))
+        self._maps = {}
+        for name, _, width in COLUMNS:
+            with open(_column_path(path, name), 'rb') as f:
+                if self.rows:
+                    self._maps[name] = mmap.mmap(f.fileno(), self.rows * width, access=mmap.ACCESS_READ)
+        with open(os.path.join(path, _DICTIONARY), encoding='utf-8') as f:
+            self.dictionary = [json.loads(line) for line in f]
+
+    def __len__(self):
+        return self.rows
+
+    def raw(self, name):
+        """Zero-copy view of a column's committed bytes."""
+        if not self.rows:
+            return memoryview(b'')
+        return memoryview(self._maps[name])[:self.rows * _WIDTHS[name]]
+
+    def column(self, name):
+        """Zero-copy typed view of a uint64, dictionary code or flags column."""
+        fmt = {'uint64': 'Q', 'dict': 'I', 'flags': 'B'}[_KINDS[name]]
+        if not _LITTLE_ENDIAN and fmt != 'B':
+            raise NotImplementedError('typed views need a little-endian host, use row()')
+        return self.raw(name).cast(fmt)
+
+    def value(self, name, index):
+        width = _WIDTHS[name]
+        raw = self.raw(name)[index * width:(index + 1) * width]
+        kind = _KINDS[name]
+        if kind == 'dict':
+            return self.dictionary[int.from_bytes(raw, 'little')]
+        if kind == 'flags':
+            return {flag: bool(raw[0] & bit) for flag, bit in FLAG_BITS.items()}
+        return _decode(kind, bytes(raw))
+
+    def row(self, index):
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        row = {}
+        for name, kind, _ in COLUMNS:
+            if kind == 'flags':
+                row.update(self.value(name, index))
+            else:
+                row[name] = self.value(name, index)
+        return row
+
+    def _flags_table(self, raised, cleared):
+        mask = want = 0
+        for name in raised:
+            mask |= FLAG_BITS[name]
+            want |= FLAG_BITS[name]
+        for name in cleared:
+            mask |= FLAG_BITS[name]
+        return bytes(1 if flags & mask == want else 0 for flags in range(256))
+
+    def _flag_hits(self, raised, cleared):
+        # yields (first row, mask) per block, with 1 in the mask for each match
+        table = self._flags_table(raised, cleared)
+        flags = self.raw('flags')
+        for start in range(0, self.rows, _SCAN_BLOCK):
+            yield start, flags[start:start + _SCAN_BLOCK].tobytes().translate(table)
+
+    def count(self, raised=(), cleared=()):
+        return sum(hits.count(1) for _, hits in self._flag_hits(raised, cleared))
+
+    def scan(self, raised=(), cleared=(), where=None):
+        """Indexes of rows with all `raised` flags set and all `cleared` unset.
+
+        `where(reader, index)` further filters the matching rows; it runs
+        in Python, so keep the flags selective when the store is large.
+        """
+        indexes = [start + match.start()
+                   for start, hits in self._flag_hits(raised, cleared)
+                   for match in re.finditer(b'\x01', hits)]
+        if where is not None:
+            indexes = [index for index in indexes if where(self, index)]
+        return indexes
+
+    def close(self):
+        for m in self._maps.values():
+            m.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _bench(path, rows, chunk=1000000):
+    started = time.perf_counter()
+    with SnapshotWriter(path) as writer:
+        writer._code('Synthetic bet')
+        for start in range(0, rows, chunk):
+            count = min(chunk, rows - start)
+            chunks = {name: os.urandom(count * width) for name, _, width in COLUMNS}
+            chunks['Assertion'] = bytes(count * 4)
+            writer._write(chunks, count)
+        writer._dictionary.flush()
+    print('wrote {} rows in {:.2f}s'.format(rows, time.perf_counter() - started))
+
+    with SnapshotReader(path) as reader:
+        started = time.perf_counter()
+        matched = reader.count(raised=['ArbiterHasVoted'], cleared=['IsOwnerTransferMade'])
+        print('count voted, owner not paid: {} rows in {:.3f}s'.format(matched, time.perf_counter() - started))
+        started = time.perf_counter()
+        found = reader.scan(raised=['ArbiterHasVoted', 'IsDecisionMade', 'IsAssertionTrue'], cleared=['IsOwnerTransferMade'])
+        print('scan owner won, not paid: {} rows in {:.3f}s'.format(len(found), time.perf_counter() - started))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command')
+    bench = commands.add_parser('bench', help='write random rows and time flag scans')
+    bench.add_argument('--rows', type=int, default=10000000)
+    bench.add_argument('--path', default='snapshot-bench')
+    show = commands.add_parser('show', help='print rows as JSON')
+    show.add_argument('path')
+    show.add_argument('--set', action='append', default=[], choices=FLAGS)
+    show.add_argument('--unset', action='append', default=[], choices=FLAGS)
+    args = parser.parse_args(argv)
+
+    if args.command == 'bench':
+        if os.path.exists(args.path):
+            parser.error('{} already exists'.format(args.path))
+        _bench(args.path, args.rows)
+    elif args.command == 'show':
+        with SnapshotReader(args.path) as reader:
+            for index in reader.scan(raised=args.set, cleared=args.unset):
+                print(json.dumps(reader.row(index)))
+    else:
+        parser.print_help()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Tests of the `tools.calibrate` gas model, run with `python -m pytest tools`."""
+
+from tools.calibrate import ASSERTION_SIZES, assertion_slots, estimate, fit, fit_field, literal_bytes
+
+MODEL = {
+    'deploy': {'base': 1500000, 'per_byte': 68, 'per_slot': 20000},
+    'deploy_fields': {
+        'arbiterAddr': {'base': 3000},
+        'feePercent': {'base': 200, 'per_byte': 68},
+        'deadline': {'base': -150, 'per_byte': 68},
+    },
+    'functions': {
+        'setAssertionText': {'base': 30000, 'per_byte': 70, 'per_slot': 20000},
+        'withdraw': {'base': 25000},
+    },
+}
+
+
+def test_assertion_slots():
+    assert [assertion_slots(size) for size in (0, 3, 31, 32, 64, 65, 400)] == [1, 1, 1, 2, 3, 4, 14]
+
+
+def test_literal_bytes():
+    assert literal_bytes('0x' + '00' * 19 + '01') == 20
+    assert [literal_bytes(value) for value in (0, 1, 255, 256, 10 ** 18, 2 ** 64)] == [1, 1, 1, 2, 8, 9]
+
+
+def test_fit_recovers_known_coefficients():
+    points = [(size, 1500000 + 68 * size + 20000 * assertion_slots(size)) for size in ASSERTION_SIZES]
+    assert fit(points) == MODEL['deploy']
+
+
+def test_fit_field():
+    assert fit_field([(1, 200 + 68), (12, 200 + 68 * 12)]) == {'base': 200, 'per_byte': 68}
+    # addresses have a single literal size
+    assert fit_field([(20, 3000)]) == {'base': 3000}
+
+
+def test_estimate_adds_costs_of_set_fields_only():
+    fields = {'assertion': 'a' * 40}
+    deploy_gas, function_gas = estimate(MODEL, fields)
+    assert deploy_gas == 1500000 + 68 * 40 + 20000 * 3
+    assert function_gas == {'setAssertionText': 30000 + 70 * 40 + 20000 * 3, 'withdraw': 25000}
+
+    set_fields = dict(fields, arbiterAddr='0x' + '11' * 20, feePercent=10 ** 18, deadline=0)
+    assert estimate(MODEL, set_fields)[0] == deploy_gas + 3000 + 200 + 68 * 8
@@ -0,0 +1,53 @@
+"""Tests of `tools.deploy`, run with `python -m pytest tools`."""
+
+import pytest
+
+from tools.deploy import BetParams, Deployer
+from tools.devchain import DevChain
+
+DEADLINE = 1600000000
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _deploy(chain, count, **kwargs):
+    clock = FakeClock()
+    with Deployer(chain, chain.accounts[0], bytecode='00', replace_after=10, poll_interval=1,
+                  clock=clock, sleep=clock.sleep, **kwargs) as deployer:
+        return deployer.deploy([BetParams('bet #{}'.format(n), DEADLINE) for n in range(count)])
+
+
+def test_stuck_nonces_are_replaced_together():
+    report = _deploy(DevChain(stuck_nonces=[1, 2, 3]), 5)
+
+    assert all(deployment.success for deployment in report.deployments)
+    assert [deployment.replacements for deployment in report.deployments] == [0, 1, 1, 1, 1]
+    # one replace_after for the whole stuck run, not one per stuck nonce
+    assert report.elapsed < 20
+
+
+def test_queued_transactions_are_resigned_at_the_replacement_price():
+    # only nonces 1 and 2 are in flight when the stuck run is repriced; 3 and
+    # 4 are still queued and must not go out at the stale price afterwards
+    report = _deploy(DevChain(stuck_nonces=[1, 2, 3, 4]), 5, max_pending=2)
+
+    assert all(deployment.success for deployment in report.deployments)
+    assert [deployment.replacements for deployment in report.deployments] == [0, 1, 1, 0, 0]
+    assert report.elapsed < 20
+
+
+def test_signer_must_match_sender():
+    chain = DevChain()
+    signer = type('Signer', (), {'address': '0x' + '22' * 20})()
+    with pytest.raises(ValueError):
+        Deployer(chain, chain.accounts[0], signer=signer)
@@ -0,0 +1,117 @@
+"""Tests of `tools.read_cache`, run with `python -m pytest tools`."""
+
+from tools.abi import BETME_GETTERS, encode_args
+from tools.read_cache import (
+    BET_AMOUNT_SLOT, FLAGS_SLOT, STATE_GETTERS, STATE_VERSION_SLOT, BetMeReadCache, LRUCache,
+)
+
+CONTRACT = '0x' + '11' * 20
+DEADLINE = 1600000000
+
+_NAMES = {selector: name for name, (selector, _) in BETME_GETTERS.items()}
+
+
+class BetMeNode(object):
+    """Answers eth_call and eth_getStorageAt for one BetMe contract from a
+    dict of getter results, recording every request in `calls`."""
+
+    def __init__(self, **values):
+        self.values = dict({name: 0 for name, (_, typ) in BETME_GETTERS.items() if typ in ('uint256', 'bool')},
+                           Assertion='Norman can light his Zippo', Deadline=DEADLINE,
+                           OpponentAddress='0x' + '44' * 20, **values)
+        self.block = 1
+        self.timestamp = DEADLINE - 10
+        self.calls = []
+
+    def mine(self, timestamp):
+        self.block += 1
+        self.timestamp = timestamp
+
+    def call(self, method, *params):
+        assert method == 'eth_getBlockByNumber'
+        return {'number': hex(self.block), 'timestamp': hex(self.timestamp)}
+
+    def batch(self, calls):
+        return [getattr(self, '_' + method)(*params) for method, params in calls]
+
+    def _eth_call(self, tx, tag):
+        assert tag == hex(self.block)
+        name = _NAMES[tx['data'][2:]]
+        self.calls.append(name)
+        return '0x' + encode_args((BETME_GETTERS[name][1],), (self.values[name],)).hex()
+
+    def _eth_getStorageAt(self, address, slot, tag):
+        assert tag == hex(self.block)
+        self.calls.append(int(slot, 16))
+        word = {
+            STATE_VERSION_SLOT: self.values['StateVersion'],
+            BET_AMOUNT_SLOT: self.values['currentBet'],
+            FLAGS_SLOT: int(self.values['OpponentAddress'], 16) + sum(
+                int(self.values[name]) << 8 * (20 + n) for n, name in enumerate(STATE_GETTERS[2:])),
+        }.get(int(slot, 16), 0)
+        return '0x' + '{:064x}'.format(word)
+
+
+def test_state_key_is_read_from_storage():
+    node = BetMeNode(StateVersion=3, currentBet=10 ** 18, ArbiterHasVoted=True, IsArbiterTransferMade=True)
+    cache = BetMeReadCache(node)
+    assert cache.read(CONTRACT, STATE_GETTERS) == dict(
+        {name: False for name in STATE_GETTERS[2:]},
+        StateVersion=3, currentBet=10 ** 18, ArbiterHasVoted=True, IsArbiterTransferMade=True,
+    )
+    assert node.calls == [STATE_VERSION_SLOT, BET_AMOUNT_SLOT, FLAGS_SLOT]
+
+
+def test_dashboard_reads_cost_three_storage_reads_per_block():
+    node = BetMeNode()
+    cache = BetMeReadCache(node)
+    dashboard = ['Assertion', 'Deadline', 'currentBet', 'ArbiterHasVoted']
+    for _ in range(6):
+        cache.read(CONTRACT, dashboard)
+        cache.read(CONTRACT, dashboard)
+        node.mine(node.timestamp + 15)
+
+    # uncached this is 4 eth_calls per read, 48 over the 6 blocks
+    assert len(node.calls) == cache.calls == 6 * 3 + 2
+    assert node.calls.count('Assertion') == node.calls.count('Deadline') == 1
+
+
+def test_payout_entry_is_valid_through_deadline_and_expires_after_it():
+    node = BetMeNode(ownerPayout=100)
+    cache = BetMeReadCache(node)
+    assert cache.call(CONTRACT, 'ownerPayout') == 100
+
+    node.mine(DEADLINE)
+    node.values['ownerPayout'] = 200
+    assert cache.call(CONTRACT, 'ownerPayout') == 100
+    assert node.calls.count('ownerPayout') == 1
+
+    node.mine(DEADLINE + 1)
+    assert cache.call(CONTRACT, 'ownerPayout') == 200
+    assert node.calls.count('ownerPayout') == 2
+
+
+def test_current_bet_change_invalidates_entries():
+    node = BetMeNode(ArbiterFeeAmountInEther=5)
+    cache = BetMeReadCache(node)
+    assert cache.call(CONTRACT, 'ArbiterFeeAmountInEther') == 5
+    assert cache.call(CONTRACT, 'ArbiterFeeAmountInEther') == 5
+    assert node.calls.count('ArbiterFeeAmountInEther') == 1
+
+    node.mine(node.timestamp + 15)
+    node.values.update(currentBet=10 ** 18, ArbiterFeeAmountInEther=7)
+    assert cache.read(CONTRACT, ['currentBet', 'ArbiterFeeAmountInEther']) == {
+        'currentBet': 10 ** 18, 'ArbiterFeeAmountInEther': 7,
+    }
+    assert node.calls.count('ArbiterFeeAmountInEther') == 2
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
@@ -0,0 +1,64 @@
+"""Tests of `tools.snapshots`, run with `python -m pytest tools`."""
+
+import os
+
+import pytest
+
+from tools import snapshots
+from tools.snapshots import COLUMNS, SnapshotReader, SnapshotWriter
+
+CONTRACT = '0x' + '11' * 20
+DEADLINE = 1600000000
+
+
+def _row(n):
+    return {'Assertion': 'bet #{}'.format(n % 2), 'Deadline': DEADLINE + n, 'currentBet': 10 ** 18 * n,
+            'StateVersion': n, 'ArbiterHasVoted': n % 2 == 1, 'OwnerAddress': '0x' + '33' * 20}
+
+
+def test_snapshot_writer_drops_uncommitted_row_after_crash(tmp_path):
+    path = str(tmp_path)
+    with SnapshotWriter(path) as writer:
+        writer.append_many([(CONTRACT, 1000 + n, _row(n)) for n in range(2)])
+
+    # a crash after some columns of the third row were written, before flags
+    for name, _, width in COLUMNS[:5]:
+        with open(os.path.join(path, name + '.col'), 'ab') as f:
+            f.write(b'\xff' * width)
+
+    with SnapshotWriter(path) as writer:
+        assert writer.rows == 2
+        writer.append(CONTRACT, 1002, _row(2))
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 3
+        row = reader.row(2)
+        assert (row['timestamp'], row['Deadline'], row['currentBet']) == (1002, DEADLINE + 2, 2 * 10 ** 18)
+        assert reader.scan(raised=['ArbiterHasVoted']) == [1]
+
+
+def test_snapshots_keep_full_uint256_and_reject_pooled_rows(tmp_path):
+    path = str(tmp_path)
+    with SnapshotWriter(path) as writer:
+        writer.append(CONTRACT, 1000, dict(_row(0), Deadline=2 ** 64))
+        with pytest.raises(ValueError):
+            writer.append(CONTRACT, 1001, dict(_row(1), Deadline=2 ** 256))
+        with pytest.raises(ValueError):
+            writer.append(CONTRACT, 1001, dict(_row(1), TotalTrue=1))
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 1
+        assert reader.value('Deadline', 0) == 2 ** 64
+
+
+def test_scan_across_blocks_with_where_on_deadline(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, '_SCAN_BLOCK', 3)
+    path = str(tmp_path)
+    with SnapshotWriter(path) as writer:
+        writer.append_many([(CONTRACT, 1000 + n, _row(n)) for n in range(10)])
+
+    with SnapshotReader(path) as reader:
+        assert reader.count(raised=['ArbiterHasVoted']) == 5
+        assert reader.scan(raised=['ArbiterHasVoted']) == [1, 3, 5, 7, 9]
+        assert reader.scan(cleared=['ArbiterHasVoted'], where=lambda r, i: r.value('Deadline', i) < DEADLINE + 5) \
+            == [0, 2, 4]